@@ -0,0 +1,172 @@
+"""
+Benchmarks of the planner on a fixed-seed corpus of maps: the shipped map files
+and generated maps of SIZES obstacles. Times Individual construction,
+find_path, fitness, every selection strategy, Population.crossover and whole
+run_algo generations, reported as evaluations/second and ms/generation.
+Results can be saved as a baseline JSON, and later runs compared against it.
+
+    python benchmark.py --save          # record the baseline
+    python benchmark.py                 # compare with it
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import time
+
+import numpy as np
+
+import genetic_algo
+from genetic_base import Individual
+from genetic_algo import Population, run_seeded
+from obstacles import Circles, ObstacleTable
+
+MAPS = ["exported_data.txt", "exported_data2.txt", "exported_map.txt"]
+SIZES = [10, 25, 100, 500, 1000]
+SEED = 0
+BASELINE = "benchmark_baseline.json"
+
+# Metrics where lower is better, the others are rates
+LOWER_IS_BETTER = ("_ms", "_ms_per_gen")
+
+
+def generated_map(n, seed = SEED):
+    "Crescent map of n obstacles on a square of side sqrt(60 n), as the GUI would draw it"
+    np.random.seed(seed)
+    side = math.sqrt(n*60)
+    circles = Circles().generate_non_overlapping_circles(n, (0.6, 2.0), (side, side), "Crescent")
+    x_init = Circles().point_on_circle(circles[0], 20)
+    x_goal = Circles().point_on_circle(circles[-1], 45)
+    return circles, x_init, x_goal
+
+
+def corpus(maps = MAPS, sizes = SIZES, seed = SEED):
+    "(name, circles, x_init, x_goal) of every map of the benchmark"
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in maps:
+        circles, x_init, x_goal = Circles().open_map(os.path.join(here, name))
+        yield name, circles, x_init, x_goal
+    for n in sizes:
+        yield "generated_" + str(n), *generated_map(n, seed)
+
+
+def per_second(fn, items):
+    "Calls of fn per second over the items"
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def milliseconds(fn, repeat):
+    "Mean duration of fn() in ms over repeat calls"
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return 1000*(time.perf_counter() - start) / repeat
+
+
+def bench_map(circles, x_init, x_goal, population, generations, repeat):
+    "Metrics of one map"
+    obs = ObstacleTable(circles)
+    results = {}
+
+    # Evaluation pieces, without caches
+    random.seed(SEED)
+    genomes = [Individual(x_init, x_goal, obs, evaluate=False) for _ in range(population)]
+    genomes = [(idv.tangency, [idv.v, idv.wingspan, idv.r_min]) for idv in genomes]
+    individuals = []
+    results['construct_per_s'] = per_second(
+        lambda g: individuals.append(Individual(x_init, x_goal, obs, list(g[0]), g[1], evaluate=False)), genomes)
+    results['find_path_per_s'] = per_second(lambda idv: idv.find_path(), individuals)
+    results['fitness_per_s'] = per_second(lambda idv: idv.fitness(), individuals)
+    results['evaluate_per_s'] = per_second(lambda g: Individual(x_init, x_goal, obs, list(g[0]), g[1]), genomes)
+
+    # Genetic operators on one population
+    random.seed(SEED)
+    np.random.seed(SEED)
+    P = Population(x_init, x_goal, obs, [population, generations, genetic_algo.SELECTION])
+    for selection in ["Roulette", "Tournament", "BestHalf", "Rank"]:
+        genetic_algo.SELECTION = selection
+        results['selection_' + selection + '_ms'] = milliseconds(P.selection, repeat)
+    genetic_algo.SELECTION = "Rank"
+    def breed():
+        P.selection()
+        P.crossover()
+    results['crossover_ms'] = milliseconds(breed, repeat)
+
+    # Whole runs, timing the generations only: the initialization is left out
+    for engine in ["objects", "arrays"]:
+        best_idv, perf, info = run_seeded(SEED, x_init, x_goal, obs, [population, generations, "Rank"], 
+                                          engine=engine, details=True)
+        times = [g['total'] for g in info['timings']['generations'] if g['iteration'] is not None]
+        results['run_' + engine + '_ms_per_gen'] = 1000*sum(times) / max(len(times), 1)
+    return results
+
+
+def run(maps = MAPS, sizes = SIZES, population = 100, generations = 5, repeat = 5):
+    "Metrics of every map of the corpus"
+    results = {}
+    for name, circles, x_init, x_goal in corpus(maps, sizes):
+        # Silence the populations' progress messages
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = bench_map(circles, x_init, x_goal, population, generations, repeat)
+        print(name + " done", flush=True)
+    return {
+        'settings': {'population': population, 'generations': generations, 'repeat': repeat, 'seed': SEED},
+        'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                    'processor': platform.processor() or platform.machine(), 'cpus': os.cpu_count()},
+        'results': results,
+    }
+
+
+def compare(current, baseline):
+    "Print every metric next to its baseline; speedup > 1 means faster now"
+    print(f"{'map':<22} {'metric':<30} {'current':>12} {'baseline':>12} {'speedup':>8}")
+    for name, metrics in current['results'].items():
+        for metric, value in metrics.items():
+            base = baseline.get('results', {}).get(name, {}).get(metric)
+            if base is None:
+                print(f"{name:<22} {metric:<30} {value:>12.2f} {'-':>12} {'-':>8}")
+                continue
+            speedup = base/value if metric.endswith(LOWER_IS_BETTER) else value/base
+            print(f"{name:<22} {metric:<30} {value:>12.2f} {base:>12.2f} {speedup:>8.2f}")
+
+
+def report(current):
+    print(f"{'map':<22} {'metric':<30} {'value':>12}")
+    for name, metrics in current['results'].items():
+        for metric, value in metrics.items():
+            print(f"{name:<22} {metric:<30} {value:>12.2f}")
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Benchmark the path planner")
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES, help="obstacle counts of the generated maps")
+    parser.add_argument("--maps", nargs="*", default=MAPS, help="shipped map files")
+    parser.add_argument("--population", type=int, default=100)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5, help="calls of each genetic operator")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="save the results as the baseline")
+    args = parser.parse_args(argv)
+
+    current = run(args.maps, args.sizes, args.population, args.generations, args.repeat)
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as file:
+            compare(current, json.load(file))
+    else:
+        report(current)
+    if args.save:
+        with open(args.baseline, "w") as file:
+            json.dump(current, file, indent=2)
+        print("Baseline saved to " + args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Bounded caches shared by the individuals of a run
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+class BoundedCache:
+    """
+    Cache of bounded size, counting hits and misses. When full, eviction drops
+    the least recently used entry ("lru") or the oldest inserted one ("fifo").
+    """
+
+    def __init__(self, maxsize = 10000, eviction = "lru"):
+        if eviction not in ("lru", "fifo"):
+            raise ValueError("Unknown eviction policy: " + str(eviction))
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        "Return the cached value for key, or None"
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        if self.eviction == "lru":
+            self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def clear(self):
+        self.data.clear()
+        self.hits, self.misses = 0, 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.data), 
+                'maxsize': self.maxsize, 'hit_rate': self.hits/lookups if lookups else 0.0}
+
+    def __len__(self):
+        return len(self.data)
+
+
+class SegmentCache(BoundedCache):
+    """
+    Dubins segment geometry shared by the whole population. Entries are keyed 
+    by the obstacle pair, the dubins mode, the quantized turn radii and 
+    wingspans, and the quantized point the segment starts from. Values are the
+    segment records built by Individual.find_segment and must not be modified.
+    """
+
+    def __init__(self, maxsize = 10000, quantum = 1e-6, eviction = "lru"):
+        super().__init__(maxsize, eviction)
+        self.quantum = quantum
+
+    def key(self, i, next, mode, R1, R2, b_arc, b_tan, current_point):
+        q = self.quantum
+        return (i, next, mode, R1 // q, R2 // q, b_arc // q, b_tan // q, 
+                current_point[0] // q, current_point[1] // q)
+
+
+class FitnessCache(BoundedCache):
+    """
+    Evaluated individuals of a run, keyed by a canonical hash of their genome 
+    (tangency, wingspan, v, r_min). Values are the snapshots returned by 
+    Individual.evaluation, so duplicated genomes skip find_path and fitness.
+    """
+
+    def key(self, tangency, wingspan, v, r_min):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(",".join(tangency).encode())
+        for genes in (wingspan, v, r_min):
+            digest.update(np.asarray(genes, dtype=float).tobytes())
+        return digest.digest()
@@ -0,0 +1,113 @@
+"""
+Headless entry point: plans a path on a map file (Circles.open_map format) and
+writes the result as JSON, without tkinter or matplotlib.
+
+    python cli.py exported_data.txt --population 100 --generations 100 --selection Rank --seed 1
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+
+import genetic_base
+from obstacles import Circles
+from genetic_algo import run_algo, run_seeded
+from islands import run_islands, SELECTIONS
+from parallel import BACKENDS
+
+
+def parse_args(argv = None):
+    parser = argparse.ArgumentParser(description="Genetic algorithm path planner for a morphing wing drone")
+    parser.add_argument("map", help="map file, as saved by the GUI")
+    parser.add_argument("--population", type=int, default=100, help="population size (even)")
+    parser.add_argument("--generations", type=int, default=100, help="number of generations")
+    parser.add_argument("--selection", default="Rank", choices=SELECTIONS, help="selection strategy")
+    parser.add_argument("--tournament-size", type=int, default=2, help="individuals per tournament")
+    parser.add_argument("--seed", type=int, default=None, help="random seed, fresh entropy if omitted")
+    parser.add_argument("--engine", default="objects", choices=["objects", "arrays"], help="population engine")
+    parser.add_argument("--executor", default=None, choices=BACKENDS, help="evaluate offspring on this backend")
+    parser.add_argument("--workers", type=int, default=None, help="executor workers, all cores if omitted")
+    parser.add_argument("--analytic", action="store_true", help="score exact arc/tangent lengths instead of sampled points")
+    parser.add_argument("--islands", type=int, default=0, help="run this many islands (ignores --selection)")
+    parser.add_argument("--migration-interval", type=int, default=10, help="generations between island migrations")
+    parser.add_argument("--migrants", type=int, default=2, help="genomes sent at each island migration")
+    parser.add_argument("--patience", type=int, default=None, help="stop after this many generations without improvement")
+    parser.add_argument("--min-improvement", type=float, default=0.0, 
+                        help="with --patience, also stop when the best score improved by less than this fraction")
+    parser.add_argument("--min-diversity", type=float, default=None, help="stop when the fraction of distinct genomes falls below this")
+    parser.add_argument("--target-score", type=float, default=None, help="stop once the best score reaches this")
+    parser.add_argument("--timings", action="store_true", help="include the time spent in each phase")
+    parser.add_argument("--telemetry", default=None, help="append one JSON line per generation to this file")
+    parser.add_argument("--output", default="-", help="JSON output file, - for stdout")
+    return parser.parse_args(argv)
+
+
+def plan(args):
+    "Run the planner as asked by args, returns (best individual, performance history, info)"
+    circles, x_init, x_goal = Circles().open_map(args.map)
+    params = [args.population, args.generations, args.selection, args.tournament_size]
+    genetic_base.ANALYTIC_FITNESS = args.analytic
+    if args.islands:
+        best_idv, perf = run_islands(x_init, x_goal, circles, params, args.islands, args.migration_interval,
+                                     args.migrants, seed=args.seed)
+        return best_idv, perf, {}
+    options = dict(engine=args.engine, executor=args.executor, max_workers=args.workers, details=True,
+                   telemetry=args.telemetry, stopping=stopping(args))
+    if args.seed is None:
+        return run_algo(x_init, x_goal, circles, params, **options)
+    return run_seeded(args.seed, x_init, x_goal, circles, params, **options)
+
+
+def stopping(args):
+    "Early stopping criteria given on the command line"
+    criteria = {'patience': args.patience, 'min_improvement': args.min_improvement,
+                'min_diversity': args.min_diversity, 'target_score': args.target_score}
+    return {name: value for name, value in criteria.items() if value}
+
+
+def result(args, best_idv, perf, info):
+    "JSON-ready summary of a run"
+    best = None
+    if best_idv:
+        best = {
+            'score': float(best_idv.score),
+            'flight_time': float(best_idv.flight_time),
+            'obstacles_crossed': [int(j) for j in best_idv.obsCrossed],
+            'tangency': list(best_idv.tangency),
+            'wingspan': [float(b) for b in best_idv.wingspan],
+            'v': [float(v) for v in best_idv.v],
+            'r_min': [float(r) for r in best_idv.r_min],
+        }
+    summary = {
+        'map': args.map,
+        'seed': args.seed,
+        'params': {'population': args.population, 'generations': args.generations,
+                   'selection': args.selection, 'tournament_size': args.tournament_size,
+                   'engine': args.engine, 'islands': args.islands, 'analytic': args.analytic},
+        'best': best,
+        'stop_reason': info.get('stop_reason'),
+        'generations': [{'generation': int(it), 'total_score': int(total), 'best_score': float(best_score)}
+                        for it, total, best_score in perf],
+    }
+    if args.timings and 'timings' in info:
+        summary['timings'] = info['timings']
+    return summary
+
+
+def main(argv = None):
+    args = parse_args(argv)
+    # Progress messages go to stderr, stdout may carry the JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        best_idv, perf, info = plan(args)
+    text = json.dumps(result(args, best_idv, perf, info), indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,3 +31,17 @@ WING_SURFACE_MAX = 0.0531 + 0.0012 * np.exp(4.6945 * B_MAX)
 
 # Algorithm Parameters
 VARIABLE_SPEED = False      # Whether to use variable speed optimization
+
+# Vehicle Model Parameters
+VEHICLE_LOOKUP = False      # Interpolate (v, r_min) in a precomputed table instead of evaluating the model
+VEHICLE_TABLE_SIZE = 4097   # Wingspans sampled in the table, from B_MIN to B_MAX
+
+# Path Parameters
+ARC_SAMPLES = 50            # Points sampled along each arc circle
+ANALYTIC_FITNESS = False    # Score flight time from exact arc/tangent lengths instead of sampled points
+
+# Cache Parameters
+SEGMENT_CACHE_SIZE = 20000      # Dubins segments kept in the shared geometry cache
+SEGMENT_CACHE_QUANTUM = 1e-6    # Resolution of the radii and points in the cache keys
+FITNESS_CACHE_SIZE = 10000      # Evaluated genomes kept per run
+FITNESS_CACHE_EVICTION = "lru"  # "lru" or "fifo"
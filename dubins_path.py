@@ -36,15 +36,51 @@ def arc_circle_crosses_circle(arc_center, arc_radius, angle_start, angle_end, ot
         if in_arc:
             return True
     return False
-import matplotlib.pyplot as plt
+
+def arc_crosses_circles(arc_center, arc_radius, angle_start, angle_end, cx, cy, radius):
+    """
+    Array version of arc_circle_crosses_circle: tests one arc (on arc_center, 
+    arc_radius, from angle_start to angle_end) against arrays of circle centres
+    cx, cy and radii at once. Returns a boolean mask, one entry per circle.
+    """
+    X1, Y1 = arc_center
+    X2, Y2 = np.asarray(cx, dtype=float), np.asarray(cy, dtype=float)
+    R1 = arc_radius
+    R2 = np.asarray(radius, dtype=float)
+    dx = X2 - X1
+    dy = Y2 - Y1
+    d = np.hypot(dx, dy)
+    # No intersection if too far or one inside the other
+    touching = (d <= R1 + R2) & (d >= np.abs(R1 - R2))
+    # Intersection points
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (R1**2 - R2**2 + d**2) / (2*d)
+        h = np.sqrt(np.maximum(R1**2 - a**2, 0))
+        xm = X1 + a * dx / d
+        ym = Y1 + a * dy / d
+        ox, oy = h * dy / d, h * dx / d
+    # Check if either intersection is within arc sweep
+    a_start = angle_start % (2 * math.pi)
+    a_end = angle_end % (2 * math.pi)
+    in_arc = np.zeros(len(d), dtype=bool)
+    for xi, yi in ((xm + ox, ym - oy), (xm - ox, ym + oy)):
+        angle = np.mod(np.arctan2(yi - Y1, xi - X1), 2 * math.pi)
+        if a_start < a_end:
+            in_arc |= (a_start <= angle) & (angle <= a_end)
+        else:
+            in_arc |= (angle >= a_start) | (angle <= a_end)
+    return touching & in_arc
 import numpy as np
 import math
+from config import ARC_SAMPLES
 C1 = {'x' : 7, 'y': 7, 'radius': 4}
 C2 = {'x' : 18, 'y': 18, 'radius': 5}
 myMode = 'RSL'
 myVP = [0,0,0,0]
 
 def draw_dotted_circle(ax, circle, color='black', linestyle='dotted'):
+    # Imported here so the planner itself runs without matplotlib
+    import matplotlib.pyplot as plt
     circle = plt.Circle([circle['x'],circle['y']], circle['radius'], color=color, fill=False, linestyle=linestyle)
     ax.add_patch(circle)
 
@@ -64,7 +100,8 @@ def random_point_on_circle(circle):
 
 "Generate a tangent line between two circles"
 
-def draw_tangent_line(circle_s = C1, circle_e = C2, mode = myMode, vehiclePars = myVP):
+def draw_tangent_line(circle_s = C1, circle_e = C2, mode = myMode, vehiclePars = myVP, dist = None, bearing = None):
+    "dist and bearing between the centres can be given when they are precomputed"
 
     X1, Y1, R1 = circle_s['x'], circle_s['y'], circle_s['radius']
     X2, Y2, R2 = circle_e['x'], circle_e['y'], circle_e['radius']
@@ -74,26 +111,29 @@ def draw_tangent_line(circle_s = C1, circle_e = C2, mode = myMode, vehiclePars =
         R1 = r_min_1
     if(R2):
         R2 = r_min_2
-    dist = np.sqrt((X2-X1)**2 + (Y2-Y1)**2)
+    if dist is None:
+        dist = np.sqrt((X2-X1)**2 + (Y2-Y1)**2)
+    if bearing is None:
+        bearing = np.arctan2((Y2-Y1),(X2-X1))
     
     #p1 : start point, p2 : end point
     if mode == "RSR":
-        theta1 =   (np.arctan2((Y2-Y1),(X2-X1)))+(np.arccos((R1-R2)/dist))
+        theta1 =   (bearing)+(np.arccos((R1-R2)/dist))
         p1 = [X1 + R1*np.cos(theta1), Y1 + R1*np.sin(theta1)]
         p2 = [X2 + R2*np.cos(theta1), Y2 + R2*np.sin(theta1)]
 
     if mode == "LSL":   
-        theta2 =   (np.arctan2((Y2-Y1),(X2-X1)))-(np.arccos((R1-R2)/dist))
+        theta2 =   (bearing)-(np.arccos((R1-R2)/dist))
         p1 = [X1 + R1*np.cos(theta2), Y1 + R1*np.sin(theta2)]
         p2 = [X2 + R2*np.cos(theta2), Y2 + R2*np.sin(theta2)]
 
     if mode == "LSR":
-        theta3 =    (np.arctan2((Y2-Y1),(X2-X1))-np.arccos((R2+R1)/dist))
+        theta3 =    (bearing-np.arccos((R2+R1)/dist))
         p1 = [X1 + R1*np.cos(theta3), Y1 + R1*np.sin(theta3)]
         p2 = [X2 - R2*np.cos(theta3), Y2 - R2*np.sin(theta3)]
 
     if mode == "RSL":
-        theta4 =    (np.arctan2((Y2-Y1),(X2-X1)) + np.arccos((R2+R1)/dist) )
+        theta4 =    (bearing + np.arccos((R2+R1)/dist) )
         p1 = [X1 + R1*np.cos(theta4), Y1 + R1*np.sin(theta4)]
         p2 = [X2 - R2*np.cos(theta4), Y2 - R2*np.sin(theta4)]
 
@@ -108,6 +148,14 @@ def draw_arc_circle(circle, p1, p2, mode = myMode, vehiclePars=myVP):
     if(R1):
         R1 = r_min_1
 
+    angle_start, angle_end = arc_angles(circle, p1, p2, mode)
+    x_arc, y_arc = arc_points(circle, R1, angle_start, angle_end)
+    
+    return [x_arc, y_arc], [circle, angle_start, angle_end, R1, b_1]
+
+def arc_angles(circle, p1, p2, mode = myMode):
+    "Start and end angles of the arc from p2 to p1 on the circle, in the turn direction of mode"
+    X1, Y1 = circle['x'], circle['y']
     angle_start = np.arctan2(p1[1] - Y1, p1[0] - X1) % (2*np.pi)
     angle_end = np.arctan2(p2[1] - Y1, p2[0] - X1) % (2*np.pi)
 
@@ -118,12 +166,14 @@ def draw_arc_circle(circle, p1, p2, mode = myMode, vehiclePars=myVP):
     if angle_end > angle_start:
         if ((mode == 'LSL') or (mode == 'LSR') or (mode == 'LT')):
             angle_start += 2 * np.pi      
+    return angle_start, angle_end
 
-    phi = np.linspace(angle_end, angle_start, 50)
-    x_arc = X1 + R1 * np.cos(phi)
-    y_arc = Y1 + R1 * np.sin(phi)
-    
-    return [x_arc, y_arc], [circle, angle_start, angle_end, R1, b_1]
+def arc_points(circle, radius, angle_start, angle_end, n_points = ARC_SAMPLES):
+    "Sample the arc of given radius around the circle centre, from angle_end to angle_start"
+    phi = np.linspace(angle_end, angle_start, n_points)
+    x_arc = circle['x'] + radius * np.cos(phi)
+    y_arc = circle['y'] + radius * np.sin(phi)
+    return x_arc, y_arc
 
 
 # CHECK COLLISIONS
@@ -167,6 +217,42 @@ def distance_point_to_line_segment(x1, y1, x2, y2, h, k):
         # The point is outside the line segment, so return the minimum distance
         return min(math.sqrt((h - x1)**2 + (k - y1)**2), math.sqrt((h - x2)**2 + (k - y2)**2))
 
+def segments_cross_circles(p1, p2, cx, cy, radius):
+    """
+    Batch version of segment_crosses_circle: tests one segment p1-p2 (points of
+    shape (2,)) or many segments (shape (n_seg, 2)) against arrays of circle 
+    centres cx, cy and radii. Returns a boolean mask of shape (n_circles,) or 
+    (n_seg, n_circles), with the same 0.01 margin as the scalar test.
+    """
+    p1, p2 = np.asarray(p1, dtype=float), np.asarray(p2, dtype=float)
+    single = p1.ndim == 1
+    p1, p2 = np.atleast_2d(p1), np.atleast_2d(p2)
+    x1, y1 = p1[:, 0:1], p1[:, 1:2]
+    x2, y2 = p2[:, 0:1], p2[:, 1:2]
+    h, k = np.asarray(cx, dtype=float), np.asarray(cy, dtype=float)
+
+    dist = distance_points_to_segments(x1, y1, x2, y2, h, k)
+    on_end_point = ((y1 == k) & (x1 == h)) | ((y2 == k) & (x2 == h))
+    # Subtract a small margin to avoid numerical errors
+    crossed = (dist < np.asarray(radius, dtype=float) - 0.01) & ~on_end_point
+    return crossed[0] if single else crossed
+
+def distance_points_to_segments(x1, y1, x2, y2, h, k):
+    "Batch version of distance_point_to_line_segment, broadcasting its arguments"
+    # Coefficients of the line equation (Ax + By + C = 0)
+    a = y2 - y1
+    b = x1 - x2
+    c = x2*y1 - x1*y2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distance = np.abs(a*h + b*k + c) / np.sqrt(a**2 + b**2)
+
+    # Points projecting outside the segment use the closest end point
+    dot_product1 = (h - x1)*(x2 - x1) + (k - y1)*(y2 - y1)
+    dot_product2 = (h - x2)*(x1 - x2) + (k - y2)*(y1 - y2)
+    inside = (dot_product1 >= 0) & (dot_product2 >= 0)
+    end_distance = np.minimum(np.sqrt((h - x1)**2 + (k - y1)**2), np.sqrt((h - x2)**2 + (k - y2)**2))
+    return np.where(inside, distance, end_distance)
+
 #Check if the arc s intersects a circle
 def circle_crosses_circle(X1,Y1,R1, X2,Y2,R2):
     
@@ -1,37 +1,101 @@
 import random
-from genetic_base import Individual
+import contextlib
+from genetic_base import Individual, TANGENCY_MODES, TANGENCY_CODES, vehicle_pars
 import numpy as np
 from config import B_MIN, B_MAX
+from obstacles import ObstacleTable
+from caches import SegmentCache, FitnessCache
+from parallel import evaluate_genomes, make_executor
+from timing import PhaseTimers, phase
+from telemetry import TelemetrySink
+from config import SEGMENT_CACHE_SIZE, SEGMENT_CACHE_QUANTUM, FITNESS_CACHE_SIZE, FITNESS_CACHE_EVICTION
 
 # Define the problem-specific parameters
 POPULATION_SIZE = 100  #Must be even
 GENERATION_COUNT = 0
 SELECTION = "Roulette"
+TOURNAMENT_SIZE = 2
 CROSSOVER_RATE = 0.8
 MUTATION_RATE = 0.2
 MUTATION_RATE_TANGENCY = 0.3
 MUTATION_RATE_WINGSPAN_TURNS = 0.1
 MUTATION_RATE_WINGSPAN_STRAIGHT = 0.5
 
+def roulette_wheel(scores, spins):
+    """
+    Roulette wheel on scores (lower is better, weight 10000/score): index of the
+    slot each spin in [0, 1] lands on, or len(scores) past the last slot.
+    """
+    weights = 10000/np.asarray(scores, dtype=float)
+    cumulative = np.cumsum(weights/np.sum(weights))
+    return np.searchsorted(cumulative, spins, side="left")
+
+def tournament(scores, n, size):
+    "Winners of n tournaments between size individuals drawn at random (lower score wins)"
+    scores = np.asarray(scores, dtype=float)
+    candidates = np.random.randint(0, len(scores), size=(n, size))
+    winners = np.argmin(scores[candidates], axis=1)
+    return candidates[np.arange(n), winners]
+
+def set_params(params):
+    "Override the run parameters [POPULATION_SIZE, GENERATION_COUNT, SELECTION(, TOURNAMENT_SIZE)]"
+    if params:
+        global POPULATION_SIZE, GENERATION_COUNT, SELECTION, TOURNAMENT_SIZE
+        POPULATION_SIZE, GENERATION_COUNT, SELECTION = params[0], params[1], params[2]
+        if len(params) > 3:
+            TOURNAMENT_SIZE = params[3]
+
 class Population:
-    def __init__(self, x_init, x_goal, obs, params = None):
-        if params:
-            global POPULATION_SIZE, GENERATION_COUNT, SELECTION
-            POPULATION_SIZE, GENERATION_COUNT, SELECTION = params[0], params[1], params[2]
+    def __init__(self, x_init, x_goal, obs, params = None, executor = None):
+        set_params(params)
         self.x_init = x_init
         self.x_goal = x_goal
-        self.obs = obs
+        self.obs = ObstacleTable.of(obs)
         self.n_obs =len(obs)
         self.perf, self.ind_selected = [], []
         self.perf_iteration = 9999
+        self.segment_cache = SegmentCache(SEGMENT_CACHE_SIZE, SEGMENT_CACHE_QUANTUM)
+        self.fitness_cache = FitnessCache(FITNESS_CACHE_SIZE, FITNESS_CACHE_EVICTION)
+        # Optional executor (see parallel.py): new individuals are then evaluated in batches
+        self.executor = executor
+        # Individuals scored so far, fully or incrementally
+        self.evaluations = 0
 
         # Initialization 
         print("Initializing population")
-        self.pop  = [Individual(x_init, x_goal, obs) for i in range(POPULATION_SIZE)]
-        self.pop[POPULATION_SIZE-1] = Individual(x_init, x_goal, obs, ['RT'] +['NT']*(self.n_obs-2) + ['LT'])
+        self.pop  = [self.new_individual() for i in range(POPULATION_SIZE)]
+        self.pop[POPULATION_SIZE-1] = self.new_individual(['RT'] +['NT']*(self.n_obs-2) + ['LT'])
+        self.evaluate(self.pop)
         self.popInit = self.pop
         self.best_indv = self.pop[0]
 
+    def new_individual(self, tangency = None, vp = None):
+        "Individual on this map, sharing the population's obstacle table and caches"
+        self.evaluations += 1
+        return Individual(self.x_init, self.x_goal, self.obs, tangency, vp, 
+                          self.segment_cache, self.fitness_cache, evaluate=self.executor is None)
+
+    def evaluate(self, individuals):
+        "Evaluate the pending individuals on the executor, genomes already in the fitness cache excepted"
+        pending, keys = [], []
+        for idv in individuals:
+            if idv.score is not None:
+                continue
+            key = self.fitness_cache.key(idv.tangency, idv.wingspan, idv.v, idv.r_min)
+            evaluation = self.fitness_cache.get(key)
+            if evaluation is not None:
+                idv.restore(evaluation)
+            else:
+                pending.append(idv)
+                keys.append(key)
+        if not pending:
+            return
+        genomes = [(idv.tangency, [list(idv.v), list(idv.wingspan), list(idv.r_min)]) for idv in pending]
+        with phase("evaluation"):
+            for idv, key, evaluation in zip(pending, keys, evaluate_genomes(self.executor, genomes)):
+                idv.restore(evaluation)
+                self.fitness_cache.put(key, evaluation)
+
     def selection(self):
         if SELECTION == "Roulette":
             self.roulette_wheel_selection()
@@ -50,43 +114,21 @@ class Population:
         pop = sorted(self.pop, key=lambda x: x.score)
         self.ind_selected = pop[:POPULATION_SIZE//2]
 
-    def tournament_selection(self, tournament_size=2):
+    def tournament_selection(self, tournament_size=None):
         population = self.pop
-        selected_individuals = []
-        population_size = len(population)
-        scores = [idv.score for idv in population]
-
-        for _ in range(population_size):
-            # Randomly select individuals for the tournament
-            tournament_indices = random.sample(range(population_size), tournament_size)
-            tournament_candidates = [population[i] for i in tournament_indices]
-            tournament_fitness = [scores[i] for i in tournament_indices]
-
-            # Choose the individual with the highest fitness from the tournament
-            winner_index = tournament_fitness.index(min(tournament_fitness))
-            selected_individuals.append(tournament_candidates[winner_index])
-
-        self.ind_selected = selected_individuals
+        # One row of randomly drawn candidates per tournament, the best score wins
+        winners = tournament([idv.score for idv in population], len(population), 
+                             tournament_size or TOURNAMENT_SIZE)
+        self.ind_selected = [population[i] for i in winners]
     
     
     def roulette_wheel_selection(self):  
         population = self.pop
-        fitness_scores = np.sum([10000/ind.score for ind in population])
-
-        probabilities = [(10000/ind.score) / fitness_scores for ind in population]
-        selected_individuals = []
-        for _ in range(len(population)):
-            # Spin the roulette wheel
-            spin = random.uniform(0, 1)
-            cumulative_probability = 0
-
-            # Find the selected individual based on the roulette wheel
-            for i, prob in enumerate(probabilities):
-                cumulative_probability += prob
-                if spin <= cumulative_probability:
-                    selected_individuals.append(population[i])
-                    break
-        self.ind_selected =  selected_individuals
+        # Spin the roulette wheel once per individual
+        spins = [random.uniform(0, 1) for _ in range(len(population))]
+        slots = roulette_wheel([ind.score for ind in population], spins)
+        # Spins past the rounded total probability select nobody
+        self.ind_selected = [population[i] for i in slots if i < len(population)]
 
     def rank_selection(self, alpha=0.05):
         # Sort by score (lower is better)
@@ -104,25 +146,32 @@ class Population:
 
 
     def crossover(self):
-        # Remove bad individuals
-        self.pop[:int(len(self.ind_selected))] = []
+        selected = self.ind_selected
+        n_pairs = len(selected)//2
+        # Remove bad individuals, the survivors and children fill the next generation
+        survivors = self.pop[len(selected):]
+        next_pop = [None]*(len(survivors) + 2*n_pairs)
+        next_pop[:len(survivors)] = survivors
 
-        options = self.ind_selected
-        for i in range(int(len(self.ind_selected)/2)):
-                parent1 = random.choice(options)
-                options.remove(parent1)
-                parent2 = random.choice(options)
-                options.remove(parent2)
+        # Pair the selected individuals through a random permutation
+        order = np.random.permutation(len(selected))
+        children = []
+        for k in range(n_pairs):
+                parent1, parent2 = selected[order[2*k]], selected[order[2*k+1]]
 
                 if(random.random() < CROSSOVER_RATE):
                     child1, child2 = self.breed_parents(parent1, parent2)
-                    child1 = self.mutate(child1)
-                    child2 = self.mutate(child2)
-                    self.pop.append(child1)
-                    self.pop.append(child2)
+                    with phase("mutation"):
+                        child1 = self.mutate(child1)
+                        child2 = self.mutate(child2)
+                    children += [child1, child2]
                 else:
-                    self.pop.append(parent1)
-                    self.pop.append(parent2)
+                    child1, child2 = parent1, parent2
+                next_pop[len(survivors) + 2*k] = child1
+                next_pop[len(survivors) + 2*k + 1] = child2
+        self.pop = next_pop
+        if self.executor is not None:
+            self.evaluate(children)
 
     def breed_parents(self, parent1, parent2):
         return self.breed_parents3(parent1, parent2 )
@@ -154,8 +203,8 @@ class Population:
             g1_r_min = np.where(mask, parent1.r_min, parent2.r_min)
             g2_r_min = np.where(mask, parent2.r_min, parent1.r_min)
         # Create individuals
-        child_1 = Individual(self.x_init, self.x_goal, self.obs, g1_tan, [g1_speed, g1_wingspan, g1_r_min]) 
-        child_2 = Individual(self.x_init, self.x_goal, self.obs, g2_tan, [g2_speed, g2_wingspan, g2_r_min]) 
+        child_1 = self.new_individual(g1_tan, [g1_speed, g1_wingspan, g1_r_min])
+        child_2 = self.new_individual(g2_tan, [g2_speed, g2_wingspan, g2_r_min])
         return child_1, child_2
 
     def breed_parents2(self, parent1, parent2):
@@ -170,8 +219,8 @@ class Population:
         g1_r_min = np.where(mask2, parent1.r_min, parent2.r_min)
         g2_r_min = np.where(mask2, parent2.r_min, parent1.r_min)
         # Create individuals
-        child_1 = Individual(self.x_init, self.x_goal, self.obs, g1_tan, [g1_speed, g1_wingspan, g1_r_min]) 
-        child_2 = Individual(self.x_init, self.x_goal, self.obs, g2_tan, [g2_speed, g2_wingspan, g2_r_min]) 
+        child_1 = self.new_individual(g1_tan, [g1_speed, g1_wingspan, g1_r_min])
+        child_2 = self.new_individual(g2_tan, [g2_speed, g2_wingspan, g2_r_min])
         return child_1, child_2
     
 
@@ -188,17 +237,20 @@ class Population:
         g1_r_min = np.where(mask, parent1.r_min, parent2.r_min)
         g2_r_min = np.where(mask, parent2.r_min, parent1.r_min)
         # Create individuals
-        child_1 = Individual(self.x_init, self.x_goal, self.obs, g1_tan, [g1_speed, g1_wingspan, g1_r_min]) 
-        child_2 = Individual(self.x_init, self.x_goal, self.obs, g2_tan, [g2_speed, g2_wingspan, g2_r_min]) 
+        child_1 = self.new_individual(g1_tan, [g1_speed, g1_wingspan, g1_r_min])
+        child_2 = self.new_individual(g2_tan, [g2_speed, g2_wingspan, g2_r_min])
         return child_1, child_2
     
     def mutate(self, idv):
+        # Obstacles whose genes changed
+        changed = set()
         if (random.random() < MUTATION_RATE):
             # Mutate tangency
             if(random.random() < MUTATION_RATE_TANGENCY):
                 p1 = random.randint(1, self.n_obs-2)
                 mode = ["RT", "LT", "NT","NT","NT"]
                 idv.tangency[p1] = (random.choice(mode))
+                changed.add(p1)
 
             # Mutate wingspan and r_min
             while(random.random() < MUTATION_RATE_WINGSPAN_TURNS):
@@ -206,34 +258,360 @@ class Population:
                 # Mutate wingspan during arccircles
                 idv.wingspan[2*p1] = random.uniform(B_MIN, B_MAX)
                 idv.randomize_vehiclePars(p1)
+                changed.update((p1, p1//2))
             while(random.random() < MUTATION_RATE_WINGSPAN_STRAIGHT):
                 p1 = random.randint(1, self.n_obs-2)   
                 # Mutate wingspan during straightlines
                 idv.wingspan[2*p1+1] = random.uniform(B_MIN, B_MAX)
                 idv.randomize_vehiclePars(p1)
+                changed.update((p1, p1//2))
+        # Only the segments around the changed obstacles are recomputed
+        if changed and idv.score is not None:
+            idv.reevaluate(changed)
+            self.evaluations += 1
         return idv
 
+    def emigrants(self, n):
+        "Genomes of the n best individuals"
+        best = sorted(self.pop, key=lambda x: x.score)[:n]
+        return [(list(idv.tangency), [list(idv.v), list(idv.wingspan), list(idv.r_min)]) for idv in best]
+
+    def immigrate(self, genomes):
+        "Replace the worst individuals by individuals of the given genomes"
+        newcomers = [self.new_individual(list(tangency), [list(genes) for genes in vp]) for tangency, vp in genomes]
+        self.evaluate(newcomers)
+        worst = sorted(range(len(self.pop)), key=lambda k: self.pop[k].score, reverse=True)
+        for k, idv in zip(worst, newcomers):
+            self.pop[k] = idv
+
     def performance(self, iteration):
         total_score = 0
         for i in range(len(self.pop)):
             total_score += self.pop[i].score
         self.perf_iteration = int(total_score)
-        self.perf.append([iteration, int(self.perf_iteration)])
+        best_score = min(idv.score for idv in self.pop)
+        self.perf.append([iteration, int(self.perf_iteration), float(best_score)])
+
+    def unique_genomes(self):
+        "Number of distinct genomes in the population"
+        return len({self.fitness_cache.key(idv.tangency, idv.wingspan, idv.v, idv.r_min) for idv in self.pop})
+
+    def diversity(self):
+        "Fraction of distinct genomes in the population"
+        return self.unique_genomes() / len(self.pop)
+
+    def generation_stats(self):
+        "Summary of the current generation, for telemetry"
+        scores = [idv.score for idv in self.pop]
+        best = self.pop[int(np.argmin(scores))]
+        return {'best_score': float(best.score), 'mean_score': float(np.mean(scores)), 
+                'worst_score': float(np.max(scores)), 'best_flight_time': float(best.flight_time),
+                'collisions': len(best.obsCrossed), 'unique_genomes': self.unique_genomes(),
+                'evaluations': self.evaluations, 'cache_hits': self.fitness_cache.hits}
     
 
 
-def run_algo(x_init, x_goal, obs, params):
+class PopulationArrays:
+    """
+    Structure-of-arrays population: one row per individual.
+        tangency        (pop, n_obs)    int8 codes into TANGENCY_MODES
+        v, wingspan,
+        r_min           (pop, 2*n_obs)  float64, same layout as Individual
+    Selection, crossover and mutation run as batched array operations. Only
+    the path geometry is evaluated per row, through Individual.
+    The operators are those of Population, drawing from numpy's generator, 
+    with two differences: the elite kept by selection is the current best 
+    row (Population keeps its initial best_indv), and children are evaluated
+    once, after mutation (Population evaluates them before mutating them, 
+    so forced tangencies from read_tangencies can carry into the mutant).
+    """
+    def __init__(self, x_init, x_goal, obs, params = None, executor = None):
+        set_params(params)
+        self.x_init = x_init
+        self.x_goal = x_goal
+        self.obs = ObstacleTable.of(obs)
+        self.n_obs = len(obs)
+        self.executor = executor
+        self.perf, self.selected = [], np.arange(0)
+        self.perf_iteration = 9999
+        self.segment_cache = SegmentCache(SEGMENT_CACHE_SIZE, SEGMENT_CACHE_QUANTUM)
+        self.fitness_cache = FitnessCache(FITNESS_CACHE_SIZE, FITNESS_CACHE_EVICTION)
+        self.evaluations = 0
+
+        # Initialization
+        print("Initializing population")
+        n, n_obs = POPULATION_SIZE, self.n_obs
+        self.tangency = np.random.randint(0, 3, size=(n, n_obs)).astype(np.int8)
+        self.tangency[:, [0, -1]] = np.random.randint(0, 2, size=(n, 2))
+        self.wingspan = np.random.uniform(B_MIN, B_MAX, size=(n, 2*n_obs))
+        self.v, self.r_min = vehicle_pars(self.wingspan)
+        self.r_min[:, [0, -1]] = 0
+        self.tangency[-1] = TANGENCY_CODES["NT"]
+        self.tangency[-1, 0], self.tangency[-1, -1] = TANGENCY_CODES["RT"], TANGENCY_CODES["LT"]
+
+        self.scores = np.empty(n)
+        self.flight_times = np.empty(n)
+        self.n_crossed = np.empty(n, dtype=int)
+        self.evaluate(np.arange(n))
+
+    def individual(self, row):
+        "Build the Individual encoded by one row of the population"
+        tangency = [TANGENCY_MODES[c] for c in self.tangency[row]]
+        vp = [self.v[row].tolist(), self.wingspan[row].tolist(), self.r_min[row].tolist()]
+        return Individual(self.x_init, self.x_goal, self.obs, tangency, vp, 
+                          self.segment_cache, self.fitness_cache)
+
+    def evaluate(self, rows):
+        "Compute the path and score of the given rows, on the executor if there is one"
+        self.evaluations += len(rows)
+        with phase("evaluation"):
+            if self.executor is not None:
+                genomes = [([TANGENCY_MODES[c] for c in self.tangency[row]],
+                            [self.v[row].tolist(), self.wingspan[row].tolist(), self.r_min[row].tolist()]) for row in rows]
+                evaluations = evaluate_genomes(self.executor, genomes)
+            else:
+                evaluations = (self.individual(row).evaluation() for row in rows)
+            for row, evaluation in zip(rows, evaluations):
+                # read_tangencies may force tangencies, keep the genome in sync
+                self.tangency[row] = [TANGENCY_CODES[t] for t in evaluation['tangency']]
+                self.scores[row] = evaluation['score']
+                self.flight_times[row] = evaluation['flight_time']
+                self.n_crossed[row] = len(evaluation['obsCrossed'])
+
+    def best_individual(self):
+        return self.individual(int(np.argmin(self.scores)))
+
+    def selection(self):
+        n = len(self.scores)
+        if SELECTION == "Roulette":
+            self.selected = np.minimum(roulette_wheel(self.scores, np.random.uniform(size=n)), n-1)
+        if SELECTION == "Tournament":
+            self.selected = tournament(self.scores, n, TOURNAMENT_SIZE)
+        if SELECTION == "BestHalf":
+            self.selected = np.argsort(self.scores, kind="stable")[:n//2]
+        if SELECTION == "Rank":
+            ranking = np.argsort(self.scores, kind="stable")
+            weights = np.exp(-0.05*np.arange(n))
+            self.selected = ranking[np.random.choice(n, size=n, p=weights/weights.sum(), replace=True)]
+
+        # Always keep the best individual from the previous generation
+        self.selected[-1] = np.argmin(self.scores)
+
+    def crossover(self):
+        n_sel, n_obs = len(self.selected), self.n_obs
+        n_pairs = n_sel//2
+        # Pair the selected individuals at random
+        order = self.selected[np.random.permutation(n_sel)[:2*n_pairs]]
+        parents1, parents2 = order[0::2], order[1::2]
+        parents = np.concatenate((parents1, parents2))
+
+        # Children start as clones of their parents
+        tangency = self.tangency[parents]
+        wingspan, v, r_min = self.wingspan[parents], self.v[parents], self.r_min[parents]
+        scores, flight_times = self.scores[parents], self.flight_times[parents]
+        n_crossed = self.n_crossed[parents]
+
+        crossed = np.flatnonzero(np.random.random(n_pairs) < CROSSOVER_RATE)
+        if len(crossed):
+            c1, c2 = crossed, crossed + n_pairs
+            # Single point crossover for tangency
+            cut = np.random.randint(0, n_obs+1, size=len(crossed))
+            mask = np.arange(n_obs) < cut[:, None]
+            t1, t2 = tangency[c1], tangency[c2]
+            tangency[c1], tangency[c2] = np.where(mask, t1, t2), np.where(mask, t2, t1)
+            # Uniform crossover for vehicle parameters
+            mask = np.random.rand(len(crossed), 2*n_obs) < 0.5
+            for genes in (wingspan, v, r_min):
+                g1, g2 = genes[c1], genes[c2]
+                genes[c1], genes[c2] = np.where(mask, g1, g2), np.where(mask, g2, g1)
+
+        # Remove bad individuals, the children take their place
+        survivors = np.arange(n_sel, len(self.scores))
+        self.tangency = np.concatenate((self.tangency[survivors], tangency))
+        self.wingspan = np.concatenate((self.wingspan[survivors], wingspan))
+        self.v = np.concatenate((self.v[survivors], v))
+        self.r_min = np.concatenate((self.r_min[survivors], r_min))
+        self.scores = np.concatenate((self.scores[survivors], scores))
+        self.flight_times = np.concatenate((self.flight_times[survivors], flight_times))
+        self.n_crossed = np.concatenate((self.n_crossed[survivors], n_crossed))
+
+        # Only the crossed children are mutated and need a new evaluation
+        children = len(survivors) + np.concatenate((crossed, crossed + n_pairs))
+        with phase("mutation"):
+            self.mutate(children)
+        self.evaluate(children)
+
+    def mutate(self, rows):
+        n_obs = self.n_obs
+        if n_obs < 3 or len(rows) == 0:
+            return
+        rows = rows[np.random.random(len(rows)) < MUTATION_RATE]
+
+        # Mutate tangency
+        tan_rows = rows[np.random.random(len(rows)) < MUTATION_RATE_TANGENCY]
+        modes = np.array([TANGENCY_CODES[m] for m in ["RT", "LT", "NT", "NT", "NT"]], dtype=np.int8)
+        self.tangency[tan_rows, np.random.randint(1, n_obs-1, size=len(tan_rows))] = \
+            modes[np.random.randint(0, len(modes), size=len(tan_rows))]
+
+        # Mutate wingspan during arc circles (even genes) and straight lines (odd genes),
+        # each row draws a geometric number of mutations. Same operator as 
+        # Population.mutate: the wingspan of gene 2p(+1) is redrawn without 
+        # updating its v and r_min, then gene p is randomized (randomize_vehiclePars(p))
+        for rate, offset in ((MUTATION_RATE_WINGSPAN_TURNS, 0), (MUTATION_RATE_WINGSPAN_STRAIGHT, 1)):
+            count = np.random.geometric(1 - rate, size=len(rows)) - 1
+            genes_rows = np.repeat(rows, count)
+            p = np.random.randint(1, n_obs-1, size=len(genes_rows))
+            self.wingspan[genes_rows, 2*p + offset] = np.random.uniform(B_MIN, B_MAX, size=len(genes_rows))
+            wingspan = np.random.uniform(B_MIN, B_MAX, size=len(genes_rows))
+            self.wingspan[genes_rows, p] = wingspan
+            self.v[genes_rows, p], self.r_min[genes_rows, p] = vehicle_pars(wingspan)
+
+    def performance(self, iteration):
+        self.perf_iteration = int(np.sum(self.scores))
+        self.perf.append([iteration, int(self.perf_iteration), float(np.min(self.scores))])
+
+    def unique_genomes(self):
+        "Number of distinct rows in the population"
+        genomes = np.concatenate((self.tangency, self.wingspan, self.v, self.r_min), axis=1)
+        return len(np.unique(genomes, axis=0))
+
+    def diversity(self):
+        "Fraction of distinct rows in the population"
+        return self.unique_genomes() / len(self.scores)
+
+    def generation_stats(self):
+        "Summary of the current generation, for telemetry"
+        best = int(np.argmin(self.scores))
+        return {'best_score': float(self.scores[best]), 'mean_score': float(np.mean(self.scores)),
+                'worst_score': float(np.max(self.scores)), 'best_flight_time': float(self.flight_times[best]),
+                'collisions': int(self.n_crossed[best]), 'unique_genomes': self.unique_genomes(),
+                'evaluations': self.evaluations, 'cache_hits': self.fitness_cache.hits}
+
+
+class EarlyStopping:
+    """
+    Stopping criteria, checked after every generation. All are optional:
+        patience            stop when the best score did not improve over the 
+                            last patience generations ("no_improvement"), or 
+                            improved by less than min_improvement of itself 
+                            ("small_improvement")
+        min_diversity       stop when the fraction of distinct genomes in the
+                            population falls below it ("diversity")
+        target_score        stop once the best score reaches it ("target_score")
+    """
+    def __init__(self, patience = None, min_improvement = 0.0, min_diversity = None, target_score = None):
+        self.patience = patience
+        self.min_improvement = min_improvement
+        self.min_diversity = min_diversity
+        self.target_score = target_score
+        self.best_scores = []
+
+    def check(self, P):
+        "Reason to stop after the current generation of population P, or None"
+        best_score = P.perf[-1][2]
+        self.best_scores.append(best_score)
+        if self.target_score is not None and best_score <= self.target_score:
+            return "target_score"
+        if self.patience and len(self.best_scores) > self.patience:
+            # Best before the window against the best reached within it, the
+            # best of each generation is not monotone
+            previous = min(self.best_scores[:-self.patience])
+            recent = min(self.best_scores[-self.patience:])
+            if recent >= previous:
+                return "no_improvement"
+            if (previous - recent) < self.min_improvement*abs(previous):
+                return "small_improvement"
+        if self.min_diversity is not None and P.diversity() < self.min_diversity:
+            return "diversity"
+        return None
+
+
+def run_algo(x_init, x_goal, obs, params, engine = "objects", executor = None, max_workers = None,
+             details = False, callback = None, telemetry = None, stopping = None):
+    """
+    Evolve a population of paths and return the best individual and the
+    performance history, [iteration, total score, best score] per generation.
+    params is [POPULATION_SIZE, GENERATION_COUNT, SELECTION], optionally 
+    followed by TOURNAMENT_SIZE. engine is "objects" (list of Individual) or 
+    "arrays" (PopulationArrays). executor opts into batched evaluation of the 
+    new individuals on a "process" pool, a "thread" pool or "serial"ly, with up
+    to max_workers workers.
+    With details, a third value info is returned: info['timings'] holds the
+    seconds spent in each phase (see timing.py), in total and per generation,
+    info['stop_reason'] why the run stopped and info['generations'] how many
+    generations it ran. callback(iteration, times) is called with the times 
+    of every generation. stopping is a dict of EarlyStopping criteria; 
+    without it the run goes on for GENERATION_COUNT generations ("generations").
+    telemetry, a TelemetrySink or a file (path) for one, gets a JSON line per
+    generation, and one for the initial population.
+    """
+    obs = ObstacleTable.of(obs)
+    pool = make_executor(executor, x_init, x_goal, obs, max_workers) if executor else None
+    # Phases are only timed when someone asks for them
+    timers = PhaseTimers() if details or callback is not None else None
+    sink = telemetry
+    if telemetry is not None and not isinstance(telemetry, TelemetrySink):
+        sink = TelemetrySink(telemetry)
+    stopping = EarlyStopping(**stopping) if stopping else None
+    try:
+        with timers or contextlib.nullcontext():
+            best_idv, perf, stop_reason = evolve(x_init, x_goal, obs, params, engine, pool, 
+                                                 timers, callback, sink, stopping)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if sink is not None and sink is not telemetry:
+            sink.close()
+    if details:
+        return best_idv, perf, {'timings': timers.summary(), 'stop_reason': stop_reason, 'generations': len(perf)}
+    return best_idv, perf
+
+
+def run_seeded(seed, x_init, x_goal, obs, params, **options):
+    "run_algo with the random generators seeded first, e.g. for one simulation out of many"
+    random.seed(seed)
+    np.random.seed(seed)
+    return run_algo(x_init, x_goal, obs, params, **options)
+
+
+def evolve(x_init, x_goal, obs, params, engine, executor, timers = None, callback = None, telemetry = None, 
+           stopping = None):
     # Initialize population
-    P = Population(x_init, x_goal, obs, params)
+    if engine == "arrays":
+        P = PopulationArrays(x_init, x_goal, obs, params, executor)
+    else:
+        P = Population(x_init, x_goal, obs, params, executor)
     best_idv, best_score = [], np.inf
+    stop_reason = "generations"
+    if telemetry is not None:
+        telemetry.generation(None, P)
+    if timers is not None:
+        timers.end_generation(None)
 
     for iteration in range(GENERATION_COUNT):
-        P.selection()
-        P.crossover()
-        P.performance(iteration)
-        ranking = sorted(P.pop, key=lambda x: x.score)  
-        if ranking[0].score < best_score:
-            best_idv = ranking[0]
+        with phase("selection"):
+            P.selection()
+        with phase("crossover"):
+            P.crossover()
+        with phase("ranking"):
+            P.performance(iteration)
+            if engine != "arrays":
+                ranking = sorted(P.pop, key=lambda x: x.score)  
+                if ranking[0].score < best_score:
+                    best_idv = ranking[0]
+        if telemetry is not None:
+            telemetry.generation(iteration, P)
+        if timers is not None:
+            times = timers.end_generation(iteration)
+            if callback is not None:
+                callback(iteration, times)
+        if stopping is not None:
+            reason = stopping.check(P)
+            if reason is not None:
+                stop_reason = reason
+                break
         #print(  "Iteration " + str(iteration) + " Perf " + 
         #        str(int(P.perf_iteration/1000)) + " Population size " + str(len(P.pop)))       
-    return best_idv, P.perf
\ No newline at end of file
+    if engine == "arrays" and GENERATION_COUNT:
+        best_idv = P.best_individual()
+    return best_idv, P.perf, stop_reason
\ No newline at end of file
@@ -1,36 +1,150 @@
 import numpy as np
 import random
 import math
-from dubins_path import draw_tangent_line, draw_arc_circle, segment_crosses_circle, circle_crosses_circle
-from obstacles import segment_intersects_circle
+from dubins_path import draw_tangent_line, arc_angles, arc_points, segments_cross_circles, arc_crosses_circles
+from obstacles import segment_intersects_circle, ObstacleTable
+from timing import phase
 from obstacles import circles_intersect
 from config import (
     FLIGHT_SPEED, B_MIN, B_MAX, ALPHA_MAX, RHO, CD0, M, G,
     TMAX, GAMMA_ACT, R_MIN_THRESHOLD, CL, V_MAX, 
-    WING_SURFACE_MIN, WING_SURFACE_MAX, VARIABLE_SPEED
+    WING_SURFACE_MIN, WING_SURFACE_MAX, VARIABLE_SPEED, ARC_SAMPLES, ANALYTIC_FITNESS,
+    VEHICLE_LOOKUP, VEHICLE_TABLE_SIZE
 )
 
+# Tangency approaches, in the order used by integer genome encodings
+TANGENCY_MODES = ("RT", "LT", "NT")
+TANGENCY_CODES = {mode: code for code, mode in enumerate(TANGENCY_MODES)}
+
+
+def vehicle_model(wingspan):
+    """
+    Flight speed and minimum turn radius for a wingspan, or an array of wingspans,
+    evaluated elementwise.
+    """
+    wingspan = np.asarray(wingspan, dtype=float)
+    wingSurface =  0.0531 + 0.0012*np.exp(4.6945*wingspan)
+    flightSpeed    = np.sqrt(2*M*G/RHO/wingSurface/CL)
+    Lift_arc       = 0.5*RHO*wingSurface*CL*flightSpeed**2
+    phiMax_arc     = np.arccos((M*G*np.cos(GAMMA_ACT))/(Lift_arc+ TMAX*np.sin(ALPHA_MAX)))
+    r_min          = flightSpeed**2 / (G * np.tan(phiMax_arc))
+    return flightSpeed, r_min
+
+
+class VehicleTable:
+    """
+    Dense table of the vehicle model over the morphing range B_MIN..B_MAX,
+    linearly interpolated. Wingspans outside the range use the exact model.
+    """
+
+    def __init__(self, size = VEHICLE_TABLE_SIZE, b_min = B_MIN, b_max = B_MAX):
+        self.wingspan = np.linspace(b_min, b_max, size)
+        self.v, self.r_min = vehicle_model(self.wingspan)
+
+    def __call__(self, wingspan):
+        wingspan = np.asarray(wingspan, dtype=float)
+        v = np.interp(wingspan, self.wingspan, self.v)
+        r_min = np.interp(wingspan, self.wingspan, self.r_min)
+        outside = (wingspan < self.wingspan[0]) | (wingspan > self.wingspan[-1])
+        if np.any(outside):
+            v_out, r_min_out = vehicle_model(wingspan)
+            v, r_min = np.where(outside, v_out, v), np.where(outside, r_min_out, r_min)
+        return v, r_min
+
+
+_vehicle_table = None
+
+def vehicle_pars(wingspan):
+    """
+    Flight speed and minimum turn radius for a wingspan or an array of wingspans,
+    e.g. a whole population at once. Uses the VehicleTable, built on first use,
+    when VEHICLE_LOOKUP is set and the exact model otherwise.
+    """
+    global _vehicle_table
+    if not VEHICLE_LOOKUP:
+        return vehicle_model(wingspan)
+    if _vehicle_table is None:
+        _vehicle_table = VehicleTable()
+    return _vehicle_table(wingspan)
+
+
+def flight_time(x, y, v):
+    """
+    Flight time along a sampled path, or along a stack of paths at once.
+    x, y : (n_points,) or (n_paths, n_points) path coordinates
+    v    : (n_v,) or (n_paths, n_v) speeds, one per path point. Missing or non
+           positive speeds fall back to FLIGHT_SPEED, and the list is padded with
+           its last value (or trimmed) to the number of points.
+    Each segment is flown at the mean speed of its end points: t = 2*L/(v0+v1).
+    Paths of different lengths can be stacked by repeating their last point.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    single = x.ndim == 1
+    x, y = np.atleast_2d(x), np.atleast_2d(y)
+    n_paths, n_points = x.shape
+    if n_points < 2:
+        times = np.zeros(n_paths)
+        return times[0] if single else times
+
+    speeds = np.atleast_2d(np.asarray(v, dtype=float))
+    speeds = np.where(speeds > 0, speeds, FLIGHT_SPEED)
+    if speeds.shape[1] < n_points:
+        speeds = np.pad(speeds, ((0, 0), (0, n_points - speeds.shape[1])), 'edge')
+    else:
+        speeds = speeds[:, :n_points]
+    speeds = np.broadcast_to(speeds, (n_paths, n_points))
+
+    # L = t*(v0+v1)/2 => t = 2*L/(v0+v1)
+    lengths = np.hypot(np.diff(x, axis=1), np.diff(y, axis=1))
+    v_sum = speeds[:, :-1] + speeds[:, 1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        segment_times = np.where(v_sum > 0, 2*lengths/v_sum, lengths/FLIGHT_SPEED)
+    times = segment_times.sum(axis=1)
+    return times[0] if single else times
+
+
+def analytic_segment_times(segments, v):
+    """
+    Flight time of each segment from its closed-form lengths, without sampling
+    points. The segment starting at obstacle i flies its arc at v[2*i] and its
+    tangent line at v[2*i+1]. Missing or non positive speeds fall back to 
+    FLIGHT_SPEED.
+    """
+    speeds = np.asarray(v, dtype=float)
+    speeds = np.where(speeds > 0, speeds, FLIGHT_SPEED)
+    starts = np.array([seg['i'] for seg in segments], dtype=int)
+    arc_lengths = np.array([seg['arc_length'] for seg in segments], dtype=float)
+    tan_lengths = np.array([seg['tan_length'] for seg in segments], dtype=float)
+    return arc_lengths/speeds[2*starts] + tan_lengths/speeds[2*starts+1]
+
+
 class Individual:
 
-    def __init__(self, x_init, x_goal, obs, tangency = None, vp = None):
+    def __init__(self, x_init, x_goal, obs, tangency = None, vp = None, segment_cache = None, fitness_cache = None, 
+                 evaluate = True):
  
         ### INITIALIZATIONS       
         self.x_init =   x_init
         self.x_goal =   x_goal
-        self.obs    =   obs.copy()
+        # Obstacle table, shared by the whole population
+        self.obs    =   ObstacleTable.of(obs)
         self.n_obs  =   len(obs)
+        # Optional dubins segment cache, shared by the whole population
+        self.segment_cache = segment_cache
         self.tangency = [9]*self.n_obs
         # Unified arrays: [arc0, tan0, arc1, tan1, ..., arcN-1, tanN-1, arcN]
         self.length = [0]*self.n_obs
         self.wingspan = ["NaN"]*(2*self.n_obs)
         self.v = ["NaN"]*(2*self.n_obs)
         self.r_min = ["NaN"]*(2*self.n_obs)
-        self.path, self.arc_list, self.tan_list = [[],[]],[],[]
-        self.arc_path = [[], []]  # [x_arc_points, y_arc_points]
-        self.tan_path = [[], []]  # [x_tan_points, y_tan_points]
+        # Compact segment records, the path points are only built when accessed
+        self.segments = []
+        self.segment_times = None
+        self._points = None
         self.obsCrossed = []
         self.flight_time = 999999
-        self.path_wingspan = []
+        self.score = None
         # Initialize parameters per segment
         if vp is not None: 
             self.v =        vp[0]
@@ -44,11 +158,51 @@ class Individual:
             self.tangency = tangency
         if tangency is None:
             self.reset_tangencies()
+        # Pending individuals are evaluated later, e.g. in a batch on an executor
+        self.fitness_cache = fitness_cache
+        if not evaluate:
+            return
+        # Duplicated genomes reuse the path and score of a previous evaluation
+        key, evaluation = None, None
+        if fitness_cache is not None:
+            key = fitness_cache.key(self.tangency, self.wingspan, self.v, self.r_min)
+            evaluation = fitness_cache.get(key)
+        if evaluation is not None:
+            self.restore(evaluation)
+            return
+
         ### PATH COMPUTATION
-        self.find_path()
+        with phase("path"):
+            self.find_path()
         
 ### FITNESS EVALUATION
-        self.score = self.fitness()
+        with phase("fitness"):
+            self.score = self.fitness()
+        if fitness_cache is not None:
+            fitness_cache.put(key, self.evaluation())
+
+    def __getstate__(self):
+        # The shared caches stay with the population when an individual is pickled
+        state = self.__dict__.copy()
+        state['segment_cache'], state['fitness_cache'] = None, None
+        return state
+
+    def evaluation(self):
+        "Snapshot of the evaluation results: everything computed from the genome"
+        return {'tangency': list(self.tangency), 'segments': self.segments, 'obsCrossed': list(self.obsCrossed),
+                'segment_times': self.segment_times, 'flight_time': self.flight_time, 
+                'tangency_penalty': self.tangency_penalty, 'score': self.score}
+
+    def restore(self, evaluation):
+        "Take the evaluation results of an identical genome"
+        self.tangency = list(evaluation['tangency'])
+        self.segments = evaluation['segments']
+        self.obsCrossed = list(evaluation['obsCrossed'])
+        self.segment_times = evaluation['segment_times']
+        self.flight_time = evaluation['flight_time']
+        self.tangency_penalty = evaluation['tangency_penalty']
+        self.score = evaluation['score']
+        self._points = None
 
     def reset_tangencies(self):
         "Randomize tangency approach (RT, LT, NT) for all obstacles"
@@ -72,12 +226,12 @@ class Individual:
         while((self.tangency[next]=="NT") and next<self.n_obs) :
             next+=1
 
-        R1 = max(self.r_min[2*i], self.obs[i]['radius'] + self.wingspan[2*i])
-        R2 = max(self.r_min[2*next], self.obs[next]['radius'] + self.wingspan[2*next])
+        obs_radius = self.obs.radius
+        R1 = max(self.r_min[2*i], obs_radius[i] + self.wingspan[2*i])
+        R2 = max(self.r_min[2*next], obs_radius[next] + self.wingspan[2*next])
 
         #If the obstacles are too close, change tangency to RSR or LSL to avoid collision      
-        if circle_crosses_circle(self.obs[i]['x'], self.obs[i]['y'], R1, 
-                                 self.obs[next]['x'], self.obs[next]['y'], R2):
+        if self.obs.distance[i, next] <= R1 + R2:
             self.tangency[next] = self.tangency[i]
 
         if self.tangency[i]== "RT":
@@ -97,134 +251,226 @@ class Individual:
 #   COMPUTE SCORE
     def fitness(self):
         "Evaluate the fitness of this chromosome"
-        # Calculate segment-wise time using v[i]
-        x, y = self.path[0], self.path[1]
-        diffs = np.sqrt(np.diff(x)**2 + np.diff(y)**2)
-        speeds = np.array([v if isinstance(v, (int, float, np.floating)) and v > 0 else FLIGHT_SPEED for v in self.v])
-        # If speeds length doesn't match points, pad or trim as needed
-        if len(speeds) < len(x):
-            speeds = np.pad(speeds, (0, len(x)-len(speeds)), 'edge')
-        elif len(speeds) > len(x):
-            speeds = speeds[:len(x)]
-        # For each segment, use v0 (start), v1 (end)
-        segment_times = []
-        for i, L in enumerate(diffs):
-            v0 = speeds[i]
-            v1 = speeds[i+1]
-            # L = t*(v0+v1)/2 => t = 2*L/(v0+v1)
-            v_sum = v0 + v1
-            if v_sum > 0:
-                t = 2*L/v_sum
-            else:
-                t = L/FLIGHT_SPEED
-            segment_times.append(t)
-        self.flight_time = np.sum(segment_times)
+        if ANALYTIC_FITNESS:
+            # Time straight from arc angles and tangent end points
+            self.segment_times = analytic_segment_times(self.segments, self.v)
+            self.flight_time = np.sum(self.segment_times)
+        else:
+            # Calculate segment-wise time using v[i], on points that are not kept
+            x, y = self.sample_path()[0]
+            self.flight_time = flight_time(x, y, self.v)
+        return self.penalized_score()
+
+    def penalized_score(self):
+        "Score of the current flight time, collisions and turns"
         self.tangency_penalty = sum(1 for t in self.tangency if t != "NT")
         
         return  10000000*(len(self.obsCrossed)) + 200*self.flight_time +  10*self.tangency_penalty
+
+    def path_length(self):
+        "Exact length of the path, from the arc and tangent lengths of each segment"
+        return sum(seg['arc_length'] + seg['tan_length'] for seg in self.segments)
     
 
     ## FIND PATH
     def find_path(self):
-        "Appends together the path of each segment, as a serie of points [x,y]"
-        x, y, current_point = [], [], self.x_init
-        arc_x, arc_y = [], []
-        tan_x, tan_y = [], []
-        i = 0
+        "Walks the segments from the initial point to the goal, collecting the obstacles crossed"
+        current_point, i = self.x_init, 0
+        self.segments, self._points = [], None
 
         while (i < self.n_obs - 1):
-            # Find the path from one obstacle to the next, as a series of points [x,y]
-            next, path_x, path_y, arc_seg_x, arc_seg_y, tan_seg_x, tan_seg_y, current_point = self.find_segment(i, current_point)
-            
-            # Full path
-            x, y = np.append(x, path_x), np.append(y, path_y)
+            # Find the path from one obstacle to the next
+            seg = self.find_segment(i, current_point)
+            self.segments.append(seg)
+            for j in seg['crossed']:
+                if j not in self.obsCrossed:
+                    self.obsCrossed.append(j)
+            current_point = seg['p2']
+            i = seg['next']
+
+    def reevaluate(self, changed):
+        """
+        Update the path and score after the genes of the obstacles in changed 
+        were modified. Segments before the one reaching the first changed 
+        obstacle are kept. The walk is recomputed from there until it is past 
+        the last changed obstacle and back at the start of a previous segment,
+        with the same point and turn direction: the rest of the path is reused.
+        """
+        old = self.segments
+        first, last = min(changed), max(changed)
+        s0 = 0
+        while s0 < len(old) - 1 and old[s0]['next'] < first:
+            s0 += 1
+        starts = {seg['i']: k for k, seg in enumerate(old)}
+
+        segments = old[:s0]
+        current_point = old[s0-1]['p2'] if s0 else self.x_init
+        i, s1 = old[s0]['i'], len(old)
+        with phase("path"):
+            while (i < self.n_obs - 1):
+                k = starts.get(i)
+                if (i > last and k is not None and old[k]['start'] == (current_point[0], current_point[1])
+                        and old[k]['mode'][0] == self.tangency[i][0]):
+                    s1 = k
+                    break
+                seg = self.find_segment(i, current_point)
+                segments.append(seg)
+                current_point = seg['p2']
+                i = seg['next']
+        new = segments[s0:]
+        segments.extend(old[s1:])
+
+        self.segments, self._points = segments, None
+        self.obsCrossed = list(dict.fromkeys(j for seg in segments for j in seg['crossed']))
+        with phase("fitness"):
+            if ANALYTIC_FITNESS:
+                # Only the time of the replaced segments changes
+                new_times = analytic_segment_times(new, self.v)
+                self.flight_time += np.sum(new_times) - np.sum(self.segment_times[s0:s1])
+                self.segment_times = np.concatenate((self.segment_times[:s0], new_times, self.segment_times[s1:]))
+                self.score = self.penalized_score()
+            else:
+                self.score = self.fitness()
+        if self.fitness_cache is not None:
+            key = self.fitness_cache.key(self.tangency, self.wingspan, self.v, self.r_min)
+            self.fitness_cache.put(key, self.evaluation())
+
+    # Point arrays, built from the segments the first time one of them is accessed
+    @property
+    def path(self):
+        "[x, y] points of the full path"
+        return self.build_path()[0]
+
+    @property
+    def arc_path(self):
+        "[x, y] points of the arcs"
+        return self.build_path()[1]
+
+    @property
+    def tan_path(self):
+        "[x, y] end points of the tangent lines"
+        return self.build_path()[2]
+
+    @property
+    def path_wingspan(self):
+        "Wingspan at each point of the full path"
+        return self.build_path()[3]
+
+    @property
+    def arc_list(self):
+        "[circle, angle_start, angle_end, turn radius, wingspan] of each arc"
+        return [[self.obs[seg['i']], seg['angle_start'], seg['angle_end'], seg['R1'], self.wingspan[2*seg['i']]]
+                for seg in self.segments]
+
+    @property
+    def tan_list(self):
+        "[p1, p2, wingspan] of each tangent line"
+        return [[seg['p1'], seg['p2'], self.wingspan[2*seg['i']+1]] for seg in self.segments]
+
+    def build_path(self):
+        "Build and keep the point arrays of the path"
+        if self._points is None:
+            self._points = self.sample_path()
+        return self._points
+
+    def sample_path(self):
+        """
+        Writes together the points of each segment, as a serie of points [x,y].
+        Returns the full path, the arc path, the tangent path and the wingspan
+        at each point of the full path.
+        """
+        n_seg = len(self.segments)
+        seg_size = ARC_SAMPLES + 2
+        x, y = np.empty(n_seg*seg_size), np.empty(n_seg*seg_size)
+        arc_x, arc_y = np.empty(n_seg*ARC_SAMPLES), np.empty(n_seg*ARC_SAMPLES)
+        tan_x, tan_y = np.empty(n_seg*2), np.empty(n_seg*2)
+        wings = np.empty(n_seg*seg_size)
+
+        for k, seg in enumerate(self.segments):
+            i, p1, p2 = seg['i'], seg['p1'], seg['p2']
+            arc_seg_x, arc_seg_y = arc_points(self.obs[i], seg['R1'], seg['angle_start'], seg['angle_end'])
+
+            # Full path: [arc_points..., p1, p2] (arc then tangent)
+            a, b = k*seg_size, k*seg_size + ARC_SAMPLES
+            x[a:b], y[a:b] = arc_seg_x, arc_seg_y
+            x[b], y[b], x[b+1], y[b+1] = p1[0], p1[1], p2[0], p2[1]
+            # For visualization, alternate arc and tangent wingspans for each segment
+            wings[a:b] = self.wingspan[2*i]
+            wings[b:b+2] = self.wingspan[2*i+1]
             # Arc path
-            arc_x = np.append(arc_x, arc_seg_x)
-            arc_y = np.append(arc_y, arc_seg_y)
+            arc_x[k*ARC_SAMPLES:(k+1)*ARC_SAMPLES] = arc_seg_x
+            arc_y[k*ARC_SAMPLES:(k+1)*ARC_SAMPLES] = arc_seg_y
             # Tangent path
-            tan_x = np.append(tan_x, tan_seg_x)
-            tan_y = np.append(tan_y, tan_seg_y)
-            #p1 and p2 are the start and end points of the tangent segment
-            p1 = (tan_seg_x[0], tan_seg_y[0])
-            p2 = (tan_seg_x[1], tan_seg_y[1])
-
-
-            # For each obstacle, check if the tangent segment or the arc segment crosses any other obstacle (except the one we are leaving)
-            is_crossing = False
-            arc_data = self.arc_list[-1] if self.arc_list else None
-
-            for j in range(len(self.obs)-1):
-                if j != i:
-                    circle = {
-                        'x': self.obs[j]['x'],
-                        'y': self.obs[j]['y'],
-                        'radius': self.obs[j]['radius'] + self.wingspan[2*i]/2
-                    }
-                    # Check tangent segment crossing
-                    if segment_crosses_circle(p1, p2, circle):
-                        is_crossing = True
-
-                    # Improved arc-circle collision detection
-                    if arc_data is not None:
-                        arc_center = (arc_data[0]['x'], arc_data[0]['y'])
-                        arc_radius = arc_data[0]['radius'] + self.wingspan[2*i]/2
-                        angle_start = arc_data[1]
-                        angle_end = arc_data[2]
-                        other_center = (self.obs[j]['x'], self.obs[j]['y'])
-                        other_radius = self.obs[j]['radius'] + self.wingspan[2*i]/2
-
-                        from dubins_path import arc_circle_crosses_circle
-                        if arc_circle_crosses_circle(arc_center, arc_radius, angle_start, angle_end, other_center, other_radius):
-                            is_crossing = True
-
-                    if is_crossing:
-                        if j not in self.obsCrossed:
-                            self.obsCrossed.append(j)
-                    is_crossing = False
-            i = next
-
-        self.path = [x, y]
-        self.arc_path = [arc_x, arc_y]
-        self.tan_path = [tan_x, tan_y]
+            tan_x[2*k], tan_x[2*k+1] = p1[0], p2[0]
+            tan_y[2*k], tan_y[2*k+1] = p1[1], p2[1]
+
+        return [x, y], [arc_x, arc_y], [tan_x, tan_y], wings
     
     def find_segment(self, i, current_point):
         """
-            Finds the path from one obstacle to the next, as a series of points [x,y]
+            Finds the segment from obstacle i to the next turning obstacle: an arc
+            on the starting circle from current_point to the takeoff point p1, 
+            then the tangent line from p1 to p2. Returns the segment record, 
+            taken from the segment cache when it was already computed.
         """
 
         mode, next = self.read_tangencies(i)
-        R1 = max(self.r_min[2*i], self.obs[i]['radius'] + self.wingspan[2*i]/2)
-        R2 = max(self.r_min[2*next], self.obs[next]['radius'] + self.wingspan[2*next]/2)
+        R1 = max(self.r_min[2*i], self.obs.radius[i] + self.wingspan[2*i]/2)
+        R2 = max(self.r_min[2*next], self.obs.radius[next] + self.wingspan[2*next]/2)
+
+        seg = None
+        if self.segment_cache is not None:
+            key = self.segment_cache.key(i, next, mode, R1, R2, self.wingspan[2*i], self.wingspan[2*i+1], current_point)
+            seg = self.segment_cache.get(key)
+        if seg is None:
+            seg = self.segment_geometry(i, next, mode, R1, R2, current_point)
+            if self.segment_cache is not None:
+                self.segment_cache.put(key, seg)
+
+        return seg
+
+    def segment_geometry(self, i, next, mode, R1, R2, current_point):
+        "Tangent points, arc angles, lengths and crossed obstacles of one segment"
         vehiclePars = [R1, R2, self.wingspan[2*i+1], self.wingspan[2*next+1]]
         # Add a tangent line between current circle and next circle, from p1 to p2
-        p1, p2, b_1 = draw_tangent_line(self.obs[i], self.obs[next], mode, vehiclePars)
-
-        vehiclePars = [R1, R2, self.wingspan[2*i], self.wingspan[2*next]]
+        p1, p2, b_1 = draw_tangent_line(self.obs[i], self.obs[next], mode, vehiclePars,
+                                        self.obs.distance[i, next], self.obs.bearing[i, next])
         # Add an arc circle on the starting circle, from current point to takeoff point p1
-        path_arc, arc_data = draw_arc_circle(self.obs[i], p1, current_point, mode, vehiclePars)
-        
-        # The path is the concatenation of the arc and the tangent line
-        path_x = np.concatenate((path_arc[0], np.array([p1[0], p2[0]])))
-        path_y = np.concatenate((path_arc[1], np.array([p1[1], p2[1]])))
-        # For visualization, alternate arc and tangent wingspans for each segment
-        # path_x: [arc_points..., p1, p2] (arc then tangent)
-        n_arc = len(path_arc[0])
-
-        self.path_wingspan.extend([self.wingspan[2*i]]*n_arc)
-        self.path_wingspan.extend([self.wingspan[2*i+1]]*2)
-        # Optionally, you could store v/r_min for each segment for further use
-
-        # Arc segment 
-        arc_seg_x = path_arc[0]
-        arc_seg_y = path_arc[1]
-        self.arc_list.append(arc_data)
-
-        # Tangent segment (just p1 to p2)
-        tan_seg_x = np.array([p1[0], p2[0]])
-        tan_seg_y = np.array([p1[1], p2[1]])
-        self.tan_list.append([p1, p2, b_1])
-
-        return next, path_x, path_y, arc_seg_x, arc_seg_y, tan_seg_x, tan_seg_y, p2
+        angle_start, angle_end = arc_angles(self.obs[i], p1, current_point, mode)
+        # Only turn at R1 if the obstacle is not a point
+        R_arc = R1 if self.obs.radius[i] else 0
+        with phase("collision"):
+            crossed = self.segment_collisions(i, p1, p2, angle_start, angle_end)
+
+        return {
+            'i': i, 'next': next, 'mode': mode, 'p1': p1, 'p2': p2, 'R1': R_arc,
+            'start': (current_point[0], current_point[1]),
+            'angle_start': angle_start, 'angle_end': angle_end,
+            'arc_length': R_arc*abs(angle_start - angle_end),
+            'tan_length': math.hypot(p2[0] - p1[0], p2[1] - p1[1]),
+            'crossed': crossed,
+        }
+
+    def segment_collisions(self, i, p1, p2, angle_start, angle_end):
+        """
+        Obstacles crossed by the tangent line p1-p2 or by the arc on obstacle i, 
+        except obstacle i itself and the goal, in index order
+        """
+        inflate = self.wingspan[2*i]/2
+        obs, grid = self.obs, self.obs.grid
+        arc_center = (obs.x[i], obs.y[i])
+        arc_radius = obs.radius[i] + inflate
+        # Only nearby obstacles go to the exact tests
+        candidates = np.union1d(grid.query_segment(p1, p2, inflate), 
+                                grid.query_circle(arc_center, arc_radius, inflate))
+        candidates = candidates[(candidates != i) & (candidates < len(self.obs)-1)]
+
+        # Check tangent segment and arc crossings against all candidates at once
+        cx, cy = obs.x[candidates], obs.y[candidates]
+        other_radius = obs.radius[candidates] + inflate
+        crossed = segments_cross_circles(p1, p2, cx, cy, other_radius)
+        crossed |= arc_crosses_circles(arc_center, arc_radius, angle_start, angle_end, cx, cy, other_radius)
+        return tuple(int(j) for j in candidates[crossed])
 
 
     
@@ -233,16 +479,10 @@ class Individual:
 
 #INITIALIZATION
     def compute_vehiclePars(self, wingspan, idx):
+        flightSpeed, r_min = vehicle_pars(wingspan)
 
-        wingSurface =  0.0531 + 0.0012*np.exp(4.6945*wingspan)
-        flightSpeed    = np.sqrt(2*M*G/RHO/wingSurface/CL)
-        Lift_arc       = 0.5*RHO*wingSurface*CL*flightSpeed**2
-        cD_arc         = CD0 + (wingSurface*CL**2/(np.pi* wingspan **2))
-        Dmax_arc       = 0.5 * RHO*wingSurface*cD_arc*flightSpeed**2
-        phiMax_arc     = np.arccos((M*G*np.cos(GAMMA_ACT))/(Lift_arc+ TMAX*np.sin(ALPHA_MAX)))
-
-        self.v[idx] = flightSpeed
-        self.r_min[idx]   = pow( flightSpeed,2 ) / (G * np.tan( phiMax_arc ) )
+        self.v[idx] = float(flightSpeed)
+        self.r_min[idx]   = float(r_min)
         self.wingspan[idx] = wingspan
 
     def randomize_vehiclePars(self, idx):
@@ -251,8 +491,10 @@ class Individual:
 
 
     def reset_vehiclePars(self):
-        for i in range(2*self.n_obs):
-            self.randomize_vehiclePars(i)
+        # Draw every wingspan, then convert them in one call
+        wingspan = [random.uniform(B_MIN, B_MAX) for i in range(2*self.n_obs)]
+        v, r_min = vehicle_pars(wingspan)
+        self.wingspan, self.v, self.r_min = wingspan, v.tolist(), r_min.tolist()
         self.r_min[0] = 0
         self.r_min[2*self.n_obs-1] = 0
 
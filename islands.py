@@ -0,0 +1,117 @@
+"""
+Island model: several populations evolve in their own processes, each with its 
+own selection strategy, and every few generations send copies of their best 
+genomes to the next island of a ring. Islands only wait for each other at 
+migrations, so one planning query can use as many cores as islands.
+"""
+
+import multiprocessing
+import queue
+import random
+import traceback
+
+import numpy as np
+
+import genetic_algo
+import genetic_base
+from genetic_algo import Population
+from obstacles import ObstacleTable
+
+SELECTIONS = ["Roulette", "Tournament", "Rank", "BestHalf"]
+POLL_INTERVAL = 1.0     # Seconds between checks that the islands are still alive
+
+
+def island(k, seed, x_init, x_goal, obs, params, migration_interval, n_migrants, inbox, outbox, results, 
+           analytic = False):
+    """
+    Evolve island k, exchanging migrants through its inbox and outbox queues.
+    On failure, None goes to the outbox so the next island does not wait for
+    migrants forever, and the traceback goes to the results.
+    """
+    # Workers may be spawned rather than forked, set the scoring mode explicitly
+    genetic_base.ANALYTIC_FITNESS = analytic
+    try:
+        random.seed(seed)
+        np.random.seed(seed)
+        P = Population(x_init, x_goal, obs, params)
+        best_idv = min(P.pop, key=lambda x: x.score)
+
+        for iteration in range(genetic_algo.GENERATION_COUNT):
+            P.selection()
+            P.crossover()
+            P.performance(iteration)
+            generation_best = min(P.pop, key=lambda x: x.score)
+            if generation_best.score < best_idv.score:
+                best_idv = generation_best
+
+            # Migration along the ring, all islands wait for their neighbour here
+            if (iteration + 1) % migration_interval == 0 and iteration + 1 < genetic_algo.GENERATION_COUNT:
+                outbox.put(P.emigrants(n_migrants))
+                migrants = inbox.get()
+                if migrants is None:
+                    raise RuntimeError("Previous island of the ring failed")
+                P.immigrate(migrants)
+    except Exception:
+        outbox.put(None)
+        results.put((k, None, traceback.format_exc()))
+        return
+
+    results.put((k, best_idv, P.perf))
+
+
+def run_islands(x_init, x_goal, obs, params, n_islands = 4, migration_interval = 10, n_migrants = 2, 
+                selections = None, seed = None):
+    """
+    Evolve n_islands populations of params[0] individuals for params[1] 
+    generations. Island k uses selections[k % len(selections)] (by default the
+    SELECTIONS strategies) and sends its n_migrants best genomes to island k+1
+    every migration_interval generations. Returns the best individual over all
+    islands and the performance history of its island.
+    """
+    selections = selections or SELECTIONS
+    obs = ObstacleTable.of(obs)
+    seeds = [int(seq.generate_state(1)[0]) for seq in np.random.SeedSequence(seed).spawn(n_islands)]
+    queues = [multiprocessing.Queue() for _ in range(n_islands)]
+    results = multiprocessing.Queue()
+
+    workers = []
+    for k in range(n_islands):
+        island_params = [params[0], params[1], selections[k % len(selections)]] + list(params[3:])
+        worker = multiprocessing.Process(target=island, args=(k, seeds[k], x_init, x_goal, obs, island_params,
+                                         migration_interval, n_migrants, queues[k], queues[(k+1) % n_islands], results,
+                                         genetic_base.ANALYTIC_FITNESS))
+        worker.start()
+        workers.append(worker)
+
+    try:
+        outcomes = collect(workers, results)
+    except BaseException:
+        # Islands waiting for a failed neighbour would never finish
+        for worker in workers:
+            worker.terminate()
+        raise
+    finally:
+        for worker in workers:
+            worker.join()
+
+    outcomes = sorted(outcomes, key=lambda outcome: outcome[0])
+    k, best_idv, perf = min(outcomes, key=lambda outcome: outcome[1].score)
+    print("Best island: " + str(k) + " (" + selections[k % len(selections)] + ")")
+    return best_idv, perf
+
+
+def collect(workers, results):
+    "Outcomes of all islands, raising RuntimeError as soon as one failed or died"
+    outcomes = {}
+    while len(outcomes) < len(workers):
+        try:
+            k, best_idv, perf = results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            for k, worker in enumerate(workers):
+                if k not in outcomes and not worker.is_alive() and worker.exitcode != 0:
+                    raise RuntimeError("Island " + str(k) + " died with exit code " + str(worker.exitcode))
+            continue
+        if best_idv is None:
+            raise RuntimeError("Island " + str(k) + " failed:\n" + perf)
+        outcomes[k] = (k, best_idv, perf)
+    return list(outcomes.values())
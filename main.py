@@ -6,17 +6,20 @@ Description: GeneticAlgorithm-based path planner for a morphing wing drone.
 """
 
 
+import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from obstacles import Circles
 from plot import draw_everything
-from genetic_algo import run_algo
+from genetic_algo import run_algo, run_seeded
 import numpy as np
 
 # Parameters
 num_circles = 15
 radius_range = (0.6 ,2.0)
 map_size = (30,30)
+base_seed = None            # Entropy of the simulation seeds, None for a fresh one per launch
 
 # Global variables to store current map
 current_map = None
@@ -29,6 +32,7 @@ last_x_goal = None
 
 def launch(circles, x_init, x_goal, num_simulations=1):
     params = [int(entry1.get()), int(entry2.get()), var2.get()]
+    max_workers = int(entry5.get() or 0) or None
     root.destroy()
     
     if num_simulations == 1:
@@ -53,55 +57,48 @@ def launch(circles, x_init, x_goal, num_simulations=1):
         draw_everything(map_size, circles, x_init, x_goal, bestIndv, perf)
 
     else:
-        # Multiple simulations
+        # Multiple simulations, one worker process each, with independent random streams
+        seeds = [int(seq.generate_state(1)[0]) for seq in np.random.SeedSequence(base_seed).spawn(num_simulations)]
         print("\n" + "="*80)
         print(f"Running {num_simulations} simulations on the same map")
         print("="*80 + "\n")
+        print(f"{'Sim #':<6} {'Score':<12} {'Flight Time':<15} {'Collisions':<12} {'Seed':<12}")
+        print("-"*80)
         
         results = []
-        for sim_num in range(1, num_simulations + 1):
-            print(f"\n--- Simulation {sim_num}/{num_simulations} ---")
-            bestIndv, perf = run_algo(x_init, x_goal, circles, params)
+        with ProcessPoolExecutor(max_workers) as pool:
+            futures = {pool.submit(run_seeded, seeds[sim_num-1], x_init, x_goal, circles, params): sim_num
+                       for sim_num in range(1, num_simulations + 1)}
+            # Results come back in completion order
+            for future in as_completed(futures):
+                sim_num = futures[future]
+                bestIndv, perf = future.result()
             
-            # Extract final performance metrics
-            if bestIndv:
-                final_score = bestIndv.score
-                flight_time = bestIndv.flight_time
-                collision_penalty = len(bestIndv.obsCrossed)
-                print("Tangency sequence:", bestIndv.tangency)
-            else:
-                final_score = float('inf')
-                flight_time = 0
-                collision_penalty = 0
-            results.append({
-                'sim_num': sim_num,
-                'final_score': final_score,
-                'flight_time': flight_time,
-                'collision_penalty': collision_penalty,
-                'bestIndv': bestIndv,
-                'perf': perf
-            })
-            print(f"Final Score: {final_score:.2f}")
-            print(f"Flight Time: {flight_time:.2f} seconds")
-            print(f"Collision Penalty: {collision_penalty}")
+                # Extract final performance metrics
+                if bestIndv:
+                    final_score = bestIndv.score
+                    flight_time = bestIndv.flight_time
+                    collision_penalty = len(bestIndv.obsCrossed)
+                else:
+                    final_score = float('inf')
+                    flight_time = 0
+                    collision_penalty = 0
+                results.append({
+                    'sim_num': sim_num,
+                    'seed': seeds[sim_num-1],
+                    'final_score': final_score,
+                    'flight_time': flight_time,
+                    'collision_penalty': collision_penalty,
+                    'bestIndv': bestIndv,
+                    'perf': perf
+                })
+                print(f"{sim_num:<6} {final_score:<12.2f} {flight_time:<15.2f} {collision_penalty:<12} {seeds[sim_num-1]:<12}")
+        results.sort(key=lambda result: result['sim_num'])
 
-        
         # Print summary statistics
-        print("\n" + "="*80)
-        print("SIMULATION SUMMARY")
-        print("="*80)
-        print(f"{'Sim #':<6} {'Score':<12} {'Flight Time':<15} {'Collisions':<12}")
-        print("-"*80)
-        
-        scores = []
-        times = []
-        collisions = []
-        
-        for result in results:
-            print(f"{result['sim_num']:<6} {result['final_score']:<12.2f} {result['flight_time']:<15.2f} {result['collision_penalty']:<12}")
-            scores.append(result['final_score'])
-            times.append(result['flight_time'])
-            collisions.append(result['collision_penalty'])
+        scores = [result['final_score'] for result in results]
+        times = [result['flight_time'] for result in results]
+        collisions = [result['collision_penalty'] for result in results]
         
         print("-"*80)
         print(f"{'BEST:':<6} {min(scores):<12.2f} {min(times):<15.2f} {min(collisions):<12}")
@@ -240,76 +237,83 @@ def show_simulation_selector(results):
 
 
 
-# Create the main window
-root = tk.Tk()
-root.title("Genetic path planning algorithm")
-
-# Create and configure the radio buttons for the first set
-var1 = tk.StringVar(value="Crescent")
-radio_button1_1 = tk.Radiobutton(root, text="Crescent", variable=var1, value="Crescent")
-radio_button1_2 = tk.Radiobutton(root, text="Distance", variable=var1, value="Distance")
-radio_button1_3 = tk.Radiobutton(root, text="Random", variable=var1, value="Random")
-
-# Create and configure the radio buttons for the second set
-var2 = tk.StringVar(value="Rank")
-radio_button2_2 = tk.Radiobutton(root, text="Roulette", variable=var2, value="Roulette")
-radio_button2_1 = tk.Radiobutton(root, text="Best half", variable=var2, value="BestHalf")
-radio_button2_3 = tk.Radiobutton(root, text="Tournament", variable=var2, value="Tournament")
-radio_button2_4 = tk.Radiobutton(root, text="Rank", variable=var2, value="Rank")
-
-# Create labels and entry widgets for numerical inputs
-label1 = tk.Label(root, text="Population:")
-entry1 = tk.Entry(root)
-entry1.insert(0, "100") 
-label2 = tk.Label(root, text="Generations:")
-entry2 = tk.Entry(root)
-entry2.insert(0, "100") 
-label3 = tk.Label(root, text="N_Obstacles:")
-entry3 = tk.Entry(root)
-entry3.insert(0, "25")
-label4 = tk.Label(root, text="Simulations:")
-entry4 = tk.Entry(root)
-entry4.insert(0, "1")
-
-# Create checkbox for saving
-save_map_var = tk.BooleanVar(value=False)
-checkbutton_save = tk.Checkbutton(root, text="Save as exported_map", variable=save_map_var)
-
-# Create buttons
-button1 = tk.Button(root, text="Open Map", command = lambda:openMap(root))
-button2 = tk.Button(root, text="Random Map", command = lambda:randomMap(root))
-
-# Create labels for radio button groups
-label_group1 = tk.Label(root, text="Obstacles sorting method")
-label_group2 = tk.Label(root, text="Selection strategy")
-
-# Arrange widgets in a column
-label_group1.grid(row=0, column=0, sticky="w")
-radio_button1_1.grid(row=1, column=0, sticky="w")
-radio_button1_2.grid(row=2, column=0, sticky="w") 
-radio_button1_3.grid(row=3, column=0, sticky="w")
-
-label_group2.grid(row=0, column=1, sticky="w")
-radio_button2_1.grid(row=1, column=1, sticky="w")
-radio_button2_2.grid(row=2, column=1, sticky="w")
-radio_button2_3.grid(row=3, column=1, sticky="w")
-radio_button2_4.grid(row=4, column=1, sticky="w")
-
-label1.grid(row=6, column=0, sticky="w")
-entry1.grid(row=7, column=0, sticky="w")
-
-label2.grid(row=6, column=1, sticky="w")
-entry2.grid(row=7, column=1, sticky="w")
-label3.grid(row=6, column=2, sticky="w")
-entry3.grid(row=7, column=2, sticky="w")
-label4.grid(row=8, column=0, sticky="w")
-entry4.grid(row=9, column=0, sticky="w")
-checkbutton_save.grid(row=9, column=2, columnspan=2, sticky="w")
-
-button1.grid(row=1, column=2)
-button2.grid(row=2, column=2)
-
-# Start the main loop
-root.mainloop()
+# The GUI is only built when run as a script, worker processes import this module
+if __name__ == "__main__":
+    # Create the main window
+    root = tk.Tk()
+    root.title("Genetic path planning algorithm")
+
+    # Create and configure the radio buttons for the first set
+    var1 = tk.StringVar(value="Crescent")
+    radio_button1_1 = tk.Radiobutton(root, text="Crescent", variable=var1, value="Crescent")
+    radio_button1_2 = tk.Radiobutton(root, text="Distance", variable=var1, value="Distance")
+    radio_button1_3 = tk.Radiobutton(root, text="Random", variable=var1, value="Random")
+
+    # Create and configure the radio buttons for the second set
+    var2 = tk.StringVar(value="Rank")
+    radio_button2_2 = tk.Radiobutton(root, text="Roulette", variable=var2, value="Roulette")
+    radio_button2_1 = tk.Radiobutton(root, text="Best half", variable=var2, value="BestHalf")
+    radio_button2_3 = tk.Radiobutton(root, text="Tournament", variable=var2, value="Tournament")
+    radio_button2_4 = tk.Radiobutton(root, text="Rank", variable=var2, value="Rank")
+
+    # Create labels and entry widgets for numerical inputs
+    label1 = tk.Label(root, text="Population:")
+    entry1 = tk.Entry(root)
+    entry1.insert(0, "100") 
+    label2 = tk.Label(root, text="Generations:")
+    entry2 = tk.Entry(root)
+    entry2.insert(0, "100") 
+    label3 = tk.Label(root, text="N_Obstacles:")
+    entry3 = tk.Entry(root)
+    entry3.insert(0, "25")
+    label4 = tk.Label(root, text="Simulations:")
+    entry4 = tk.Entry(root)
+    entry4.insert(0, "1")
+    label5 = tk.Label(root, text="Workers (0 = all cores):")
+    entry5 = tk.Entry(root)
+    entry5.insert(0, str(os.cpu_count() or 1))
+
+    # Create checkbox for saving
+    save_map_var = tk.BooleanVar(value=False)
+    checkbutton_save = tk.Checkbutton(root, text="Save as exported_map", variable=save_map_var)
+
+    # Create buttons
+    button1 = tk.Button(root, text="Open Map", command = lambda:openMap(root))
+    button2 = tk.Button(root, text="Random Map", command = lambda:randomMap(root))
+
+    # Create labels for radio button groups
+    label_group1 = tk.Label(root, text="Obstacles sorting method")
+    label_group2 = tk.Label(root, text="Selection strategy")
+
+    # Arrange widgets in a column
+    label_group1.grid(row=0, column=0, sticky="w")
+    radio_button1_1.grid(row=1, column=0, sticky="w")
+    radio_button1_2.grid(row=2, column=0, sticky="w") 
+    radio_button1_3.grid(row=3, column=0, sticky="w")
+
+    label_group2.grid(row=0, column=1, sticky="w")
+    radio_button2_1.grid(row=1, column=1, sticky="w")
+    radio_button2_2.grid(row=2, column=1, sticky="w")
+    radio_button2_3.grid(row=3, column=1, sticky="w")
+    radio_button2_4.grid(row=4, column=1, sticky="w")
+
+    label1.grid(row=6, column=0, sticky="w")
+    entry1.grid(row=7, column=0, sticky="w")
+
+    label2.grid(row=6, column=1, sticky="w")
+    entry2.grid(row=7, column=1, sticky="w")
+    label3.grid(row=6, column=2, sticky="w")
+    entry3.grid(row=7, column=2, sticky="w")
+    label4.grid(row=8, column=0, sticky="w")
+    entry4.grid(row=9, column=0, sticky="w")
+    label5.grid(row=8, column=1, sticky="w")
+    entry5.grid(row=9, column=1, sticky="w")
+    checkbutton_save.grid(row=9, column=2, columnspan=2, sticky="w")
+
+    button1.grid(row=1, column=2)
+    button2.grid(row=2, column=2)
+
+    # Start the main loop
+    root.mainloop()
 
 
@@ -1,5 +1,6 @@
 import numpy as np
 import math
+from types import MappingProxyType
 from config import B_MAX, B_MIN
 
 TRESHOLD = 0.95
@@ -136,6 +137,111 @@ class Circles():
             file.write(content)
 
 
+class ObstacleTable():
+    """
+    Immutable obstacle map shared by every individual and population of a run.
+    Holds contiguous, read-only x, y and radius arrays and the data derived 
+    from them once per map (collision grid, pairwise centre distances and 
+    bearings). Indexing returns the obstacle as a
+    read-only {'x', 'y', 'radius'} mapping, like the circles lists.
+    """
+
+    def __init__(self, circles):
+        self.circles = tuple(MappingProxyType(dict(c)) for c in circles)
+        self.x = np.array([c['x'] for c in circles], dtype=float)
+        self.y = np.array([c['y'] for c in circles], dtype=float)
+        self.radius = np.array([c['radius'] for c in circles], dtype=float)
+        for array in (self.x, self.y, self.radius):
+            array.setflags(write=False)
+        self.n = len(self.circles)
+
+        # Derived data
+        self.grid = ObstacleGrid(self.x, self.y, self.radius)
+        # distance[i, j] and bearing[i, j] from the centre of i to the centre of j
+        dx = self.x[None, :] - self.x[:, None]
+        dy = self.y[None, :] - self.y[:, None]
+        self.distance = np.sqrt(dx**2 + dy**2)
+        self.bearing = np.arctan2(dy, dx)
+        for array in (self.distance, self.bearing):
+            array.setflags(write=False)
+
+    @classmethod
+    def of(cls, obs):
+        "Table for obs, which may already be one"
+        return obs if isinstance(obs, cls) else cls(obs)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return self.circles[i]
+
+    def __iter__(self):
+        return iter(self.circles)
+
+    def __reduce__(self):
+        return (ObstacleTable, ([dict(c) for c in self.circles],))
+
+
+class ObstacleGrid():
+    """
+    Uniform grid over the obstacle circles, used as a broad phase for collision 
+    checks. It is built once per map, by its ObstacleTable. Each cell lists the
+    obstacles whose circle, inflated by margin, overlaps the cell.
+    Queries return the sorted indices of the obstacles that may be touched.
+    """
+
+    def __init__(self, x, y, radius, margin = B_MAX/2, cell_size = None):
+        self.margin = margin
+        n = len(x)
+        inflated = radius + margin
+
+        self.x_min, self.y_min = np.min(x - inflated), np.min(y - inflated)
+        width = np.max(x + inflated) - self.x_min
+        height = np.max(y + inflated) - self.y_min
+        if cell_size is None:
+            # About one obstacle per cell, but no smaller than an obstacle
+            cell_size = max(math.sqrt(width*height/n), 2*np.mean(inflated), 1e-6)
+        self.cell_size = cell_size
+        self.nx = int(width // cell_size) + 1
+        self.ny = int(height // cell_size) + 1
+
+        cells = [[] for _ in range(self.nx*self.ny)]
+        for j in range(n):
+            ix0, iy0, ix1, iy1 = self.cell_range(x[j] - inflated[j], y[j] - inflated[j],
+                                                 x[j] + inflated[j], y[j] + inflated[j])
+            for ix in range(ix0, ix1 + 1):
+                for iy in range(iy0, iy1 + 1):
+                    cells[ix*self.ny + iy].append(j)
+        self.cells = [np.array(c, dtype=int) for c in cells]
+
+    def cell_range(self, x_min, y_min, x_max, y_max):
+        "Cells covered by a bounding box, clipped to the grid"
+        ix0 = min(max(int((x_min - self.x_min) // self.cell_size), 0), self.nx - 1)
+        iy0 = min(max(int((y_min - self.y_min) // self.cell_size), 0), self.ny - 1)
+        ix1 = min(max(int((x_max - self.x_min) // self.cell_size), 0), self.nx - 1)
+        iy1 = min(max(int((y_max - self.y_min) // self.cell_size), 0), self.ny - 1)
+        return ix0, iy0, ix1, iy1
+
+    def query_box(self, x_min, y_min, x_max, y_max, inflate = 0):
+        "Obstacles whose circle inflated by max(inflate, margin) may overlap the box"
+        # Degenerate geometry (NaN tangent points) crosses nothing, as in the exact tests
+        if not np.isfinite([x_min, y_min, x_max, y_max, inflate]).all():
+            return np.empty(0, dtype=int)
+        extra = max(inflate - self.margin, 0)
+        ix0, iy0, ix1, iy1 = self.cell_range(x_min - extra, y_min - extra, x_max + extra, y_max + extra)
+        found = [self.cells[ix*self.ny + iy] for ix in range(ix0, ix1 + 1) for iy in range(iy0, iy1 + 1)]
+        return np.unique(np.concatenate(found))
+
+    def query_segment(self, p1, p2, inflate = 0):
+        "Obstacles that may be crossed by the segment p1-p2"
+        return self.query_box(min(p1[0], p2[0]), min(p1[1], p2[1]), max(p1[0], p2[0]), max(p1[1], p2[1]), inflate)
+
+    def query_circle(self, center, radius, inflate = 0):
+        "Obstacles that may be crossed by a circle (or any arc of it)"
+        return self.query_box(center[0] - radius, center[1] - radius, center[0] + radius, center[1] + radius, inflate)
+
+
 def distance_point_to_line_segment(h, k, x1, y1, x2, y2):
     def distance_point_to_line(x, y, a, b, c):
         return abs(a*x + b*y + c) / math.sqrt(a**2 + b**2)
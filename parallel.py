@@ -0,0 +1,67 @@
+"""
+Executors evaluating batches of genomes for the populations.
+"process" uses a process pool, "thread" a thread pool and "serial" evaluates in
+the calling thread. Every worker holds its own copy of the map and segment 
+cache, set up once by init_worker. All random draws stay in the main process,
+so runs with a fixed seed do not depend on the backend.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import genetic_base
+from genetic_base import Individual
+from caches import SegmentCache
+from config import SEGMENT_CACHE_SIZE, SEGMENT_CACHE_QUANTUM
+
+BACKENDS = ("process", "thread", "serial")
+
+# Map and cache of the current worker
+_worker = threading.local()
+
+
+def init_worker(x_init, x_goal, obs, analytic):
+    _worker.x_init, _worker.x_goal, _worker.obs = x_init, x_goal, obs
+    _worker.segment_cache = SegmentCache(SEGMENT_CACHE_SIZE, SEGMENT_CACHE_QUANTUM)
+    genetic_base.ANALYTIC_FITNESS = analytic
+
+
+def evaluate_genome(genome):
+    "Evaluation snapshot (Individual.evaluation) of a (tangency, [v, wingspan, r_min]) genome"
+    tangency, vp = genome
+    idv = Individual(_worker.x_init, _worker.x_goal, _worker.obs, list(tangency), vp, _worker.segment_cache)
+    return idv.evaluation()
+
+
+class SerialExecutor:
+    "Executor interface running every task in the calling thread"
+
+    def __init__(self, initializer = None, initargs = ()):
+        if initializer is not None:
+            initializer(*initargs)
+
+    def map(self, fn, *iterables, chunksize = 1):
+        return map(fn, *iterables)
+
+    def shutdown(self, wait = True):
+        pass
+
+
+def make_executor(backend, x_init, x_goal, obs, max_workers = None):
+    "Executor of the given backend, with workers set up for this map"
+    initargs = (x_init, x_goal, obs, genetic_base.ANALYTIC_FITNESS)
+    if backend == "process":
+        return ProcessPoolExecutor(max_workers, initializer=init_worker, initargs=initargs)
+    if backend == "thread":
+        return ThreadPoolExecutor(max_workers, initializer=init_worker, initargs=initargs)
+    if backend == "serial":
+        return SerialExecutor(init_worker, initargs)
+    raise ValueError("Unknown executor backend: " + str(backend))
+
+
+def evaluate_genomes(executor, genomes):
+    "Evaluation snapshots of the genomes, in order"
+    workers = getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+    chunksize = max(1, len(genomes) // (4*workers))
+    return list(executor.map(evaluate_genome, genomes, chunksize=chunksize))
@@ -0,0 +1,57 @@
+"""
+Telemetry of a run: one JSON line per generation, written as the run goes so
+long runs can be followed live (e.g. with tail -f) and analysed afterwards.
+"""
+
+import json
+import time
+
+
+class TelemetrySink:
+    """
+    JSON lines sink for the generations of a run. file is a path, opened in
+    append mode, or an open text file. Lines are flushed every flush_every
+    generations. Each line holds the generation, the population's
+    generation_stats (best/mean/worst score, best flight time, obstacles
+    crossed by the best individual, unique genomes), the evaluations and
+    fitness cache hits of that generation, and the wall clock time.
+    """
+
+    def __init__(self, file, flush_every = 1):
+        self.owned = isinstance(file, str)
+        self.file = open(file, "a") if self.owned else file
+        self.flush_every = flush_every
+        self.lines = 0
+        self.start = time.time()
+        self.evaluations, self.cache_hits = 0, 0
+
+    def generation(self, iteration, population):
+        "Write the line of a generation"
+        stats = population.generation_stats()
+        # Counters are cumulative on the population, lines hold the generation's share
+        evaluations, cache_hits = stats['evaluations'], stats['cache_hits']
+        stats['evaluations'] = evaluations - self.evaluations
+        stats['cache_hits'] = cache_hits - self.cache_hits
+        self.evaluations, self.cache_hits = evaluations, cache_hits
+
+        now = time.time()
+        self.write(dict(generation=iteration, **stats, wall_time=now, elapsed=now - self.start))
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.lines += 1
+        if self.lines % self.flush_every == 0:
+            self.file.flush()
+
+    def close(self):
+        if self.owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,99 @@
+"""
+Phase timers of a run. While a PhaseTimers is active, the planner code marks
+its phases with `with phase(name):`. Phases may nest: time spent in an inner
+phase is only counted there, so the phases of a generation add up to its wall
+time. Without an active timer, phase() returns a shared no-op context, and only
+the thread that started the timer is measured (executor threads are not).
+"""
+
+import threading
+import time
+
+PHASES = ("selection", "crossover", "mutation", "path", "collision", "fitness", "evaluation", "ranking")
+
+_active = None
+
+
+class _NoPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    __slots__ = ("timers", "name")
+
+    def __init__(self, timers, name):
+        self.timers, self.name = timers, name
+
+    def __enter__(self):
+        self.timers.push(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.timers.pop()
+        return False
+
+
+def phase(name):
+    "Context measuring the named phase on the active timer, if there is one"
+    timers = _active
+    if timers is None or timers.thread != threading.get_ident():
+        return _NO_PHASE
+    return _Phase(timers, name)
+
+
+class PhaseTimers:
+    """
+    Seconds spent in each phase, per generation. Time outside every phase
+    counts as "other".
+    """
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.stack = ["other"]
+        self.current = dict.fromkeys(PHASES + ("other",), 0.0)
+        self.totals = dict(self.current)
+        self.generations = []
+        self.mark = self.start = time.perf_counter()
+
+    def push(self, name):
+        now = time.perf_counter()
+        self.current[self.stack[-1]] += now - self.mark
+        self.stack.append(name)
+        self.mark = now
+
+    def pop(self):
+        now = time.perf_counter()
+        self.current[self.stack.pop()] += now - self.mark
+        self.mark = now
+
+    def end_generation(self, iteration):
+        "Close the times of a generation (iteration None for the initialization) and return them"
+        now = time.perf_counter()
+        self.current[self.stack[-1]] += now - self.mark
+        times = dict(self.current, iteration=iteration, total=now - self.start)
+        for name, seconds in self.current.items():
+            self.totals[name] += seconds
+            self.current[name] = 0.0
+        self.generations.append(times)
+        self.mark = self.start = now
+        return times
+
+    def summary(self):
+        "Total seconds per phase and the per-generation times"
+        return {'totals': dict(self.totals), 'generations': self.generations}
+
+    def __enter__(self):
+        global _active
+        self.previous, _active = _active, self
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self.previous
+        return False